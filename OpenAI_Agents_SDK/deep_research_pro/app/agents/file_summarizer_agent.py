@@ -6,6 +6,7 @@ from typing import List, Optional
 from openai import AsyncOpenAI
 
 from app.core.semantic_chunker import SemanticChunker
+from app.core.tokens import TOKEN_BUDGET
 from app.schemas.source import SourceDoc
 
 CHUNK_SUMMARY_MODEL = "gpt-4o-mini"  # Simple summarization task
@@ -55,11 +56,13 @@ Chunk:
 {chunk}
 """
 
+        reservation = await TOKEN_BUDGET.reserve_call(prompt)
         response = await self.client.chat.completions.create(
             model=CHUNK_SUMMARY_MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.0,
         )
+        TOKEN_BUDGET.reconcile(reservation, response.usage.total_tokens if response.usage else None)
         return response.choices[0].message.content.strip()
 
     async def merge_summaries(self, summaries: List[str]) -> str:
@@ -71,11 +74,13 @@ Chunk Summaries:
 {summaries}
 """
 
+        reservation = await TOKEN_BUDGET.reserve_call(prompt)
         response = await self.client.chat.completions.create(
             model=FINAL_MERGE_MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.2,
         )
+        TOKEN_BUDGET.reconcile(reservation, response.usage.total_tokens if response.usage else None)
         return response.choices[0].message.content.strip()
 
     # --------- MAIN PIPELINE ----------
@@ -27,8 +27,11 @@ class SearchAgent:
             model_settings=ModelSettings(temperature=0.3, max_output_tokens=5000),
         )
 
-    async def summarize_result_async(self, source_item: SourceItem) -> str:
-        """Summarize a single search result into detailed analytical summary."""
+    async def summarize_result_async(self, source_item: SourceItem, reservation=None) -> str:
+        """Summarize a single search result into detailed analytical summary.
+        
+        ``reservation`` is the caller's TPM budget reservation for this call, if any.
+        """
         prompt = (
             f"Title: {source_item.title}\n"
             f"URL: {source_item.url}\n"
@@ -39,5 +42,5 @@ class SearchAgent:
             "- Do NOT hallucinate content that is not clearly implied by the snippet.\n"
             "Return plain text using markdown bullets for the key points, no headings.\n"
         )
-        result = await safe_run_async(self.agent, prompt, str)
+        result = await safe_run_async(self.agent, prompt, str, reservation=reservation)
         return result.strip() if result else ""
@@ -11,16 +11,11 @@ from pydantic import BaseModel, Field
 from app.schemas.source import SourceDoc
 from app.schemas.report import ResearchReport, Section
 from app.core.safe import safe_run_async
+from app.core.tokens import count_tokens
 
 def _estimate_token_count(text: str) -> int:
-    """Estimate token count (rough approximation: ~4 chars per token for English)."""
-    try:
-        import tiktoken
-        encoding = tiktoken.encoding_for_model("gpt-4o")
-        return len(encoding.encode(text))
-    except ImportError:
-        # Fallback: rough estimate (4 chars per token)
-        return len(text) // 4
+    """Estimate token count (tiktoken, or ~4 chars per token without it)."""
+    return count_tokens(text)
 
 class WriterOutput(BaseModel):
     """Structured output schema for Writer agent."""
@@ -216,8 +211,11 @@ class WriterAgent:
             raise ValueError("WriterAgent output missing sections. The model did not generate any report sections.")
         
         # Check for empty or very short sections (warn but don't fail - let LLM decide structure)
-        empty_sections = [i for i, sec in enumerate(out.sections) if not sec.summary or len(sec.summary.strip()) < 30]
-        if empty_sections:
+        # Healthy reports stop after the any() scan; the index list is only built for the warning
+        def _is_short(sec) -> bool:
+            return not sec.summary or len(sec.summary.strip()) < 30
+        if any(_is_short(sec) for sec in out.sections):
+            empty_sections = [i for i, sec in enumerate(out.sections) if _is_short(sec)]
             print(f"Warning: WriterAgent generated {len(empty_sections)} empty/short sections: {empty_sections}")
         
         # Validate outline matches sections (warn but don't fail)
@@ -210,21 +210,10 @@ def build_analytics_payload(
     word_count = _safe_word_count(total_text)
     num_sections = len(report.sections)
     num_sources = len(sources)
-    num_file_sources = sum(
-        1 for s in sources if (s.source_type or "").lower() == "file"
-    )
-    num_web_sources = num_sources - num_file_sources
-
-    overview = SessionOverview(
-        topic=topic,
-        word_count=word_count,
-        num_sections=num_sections,
-        num_sources=num_sources,
-        num_web_sources=num_web_sources,
-        num_file_sources=num_file_sources,
-    )
 
     # ------------------------ SOURCE DISTRIBUTION ------------------------
+    # File sources are counted in the distribution pass below (one traversal of sources)
+    num_file_sources = 0
     # Source types
     type_counter: Counter[str] = Counter()
     # Domains
@@ -237,6 +226,8 @@ def build_analytics_payload(
     for src in sources:
         stype = (src.source_type or "unknown").lower()
         type_counter[stype] += 1
+        if stype == "file":
+            num_file_sources += 1
 
         domain = _extract_domain(src.url)
         if domain:
@@ -251,6 +242,17 @@ def build_analytics_payload(
             credibility_score = _score_credibility(src.url, src.source_type, src.published)
         cred_counter[int(credibility_score)] += 1
 
+    num_web_sources = num_sources - num_file_sources
+
+    overview = SessionOverview(
+        topic=topic,
+        word_count=word_count,
+        num_sections=num_sections,
+        num_sources=num_sources,
+        num_web_sources=num_web_sources,
+        num_file_sources=num_file_sources,
+    )
+
     source_type_stats = [
         SourceTypeStat(source_type=t, count=c)
         for t, c in type_counter.most_common()
@@ -49,6 +49,8 @@ class CacheManager:
         
         # L1: In-memory cache
         self.l1_cache: Dict[str, Tuple[List[Dict], Optional[str], float]] = {}
+        # L1 for per-result summaries (serialized SourceDocs), keyed like l1_cache
+        self.l1_summaries: Dict[str, Tuple[List[Dict], float]] = {}
         
         # Initialize L2: SQLite cache
         self._init_db()
@@ -78,7 +80,8 @@ class CacheManager:
                     v TEXT NOT NULL,
                     ts INTEGER NOT NULL,
                     last_access INTEGER NOT NULL,
-                    access_count INTEGER DEFAULT 1
+                    access_count INTEGER DEFAULT 1,
+                    summaries TEXT
                 )
             """)
         else:
@@ -94,6 +97,9 @@ class CacheManager:
             if "access_count" not in columns:
                 cursor.execute("ALTER TABLE qcache ADD COLUMN access_count INTEGER DEFAULT 1")
                 cursor.execute("UPDATE qcache SET access_count = 1 WHERE access_count IS NULL")
+            
+            if "summaries" not in columns:
+                cursor.execute("ALTER TABLE qcache ADD COLUMN summaries TEXT")
         
         # Create indexes
         cursor.execute("""
@@ -188,8 +194,9 @@ class CacheManager:
         key = self._make_key(query)
         now = time.time()
         
-        # Store in L1
+        # Store in L1 (fresh results invalidate any summaries of the old ones)
         self.l1_cache[key] = (results, summary, now)
+        self.l1_summaries.pop(key, None)
         
         # Store in L2 (SQLite)
         data = {
@@ -211,7 +218,7 @@ class CacheManager:
                 cursor.execute(
                     """
                     UPDATE qcache 
-                    SET v = ?, ts = ?, last_access = ?
+                    SET v = ?, ts = ?, last_access = ?, summaries = NULL
                     WHERE k = ?
                     """,
                     (data_json, int(now), int(now), key)
@@ -237,6 +244,67 @@ class CacheManager:
             self.cleanup()
             self._last_cleanup = now
     
+    def get_summaries(self, query: str) -> Optional[List[Dict]]:
+        """
+        Get the summarized source dicts stored for a query's cached results.
+        Returns None if none were stored or the entry has expired.
+        """
+        if self._is_time_sensitive(query):
+            return None
+        
+        key = self._make_key(query)
+        now = time.time()
+        
+        # Check L1 cache first
+        if key in self.l1_summaries:
+            docs, cached_time = self.l1_summaries[key]
+            if now - cached_time < self.ttl_seconds:
+                return docs
+            del self.l1_summaries[key]
+        
+        # Check L2 cache (SQLite)
+        conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                "SELECT summaries, ts FROM qcache WHERE k = ?",
+                (key,)
+            )
+            row = cursor.fetchone()
+        finally:
+            conn.close()
+        
+        if row and row[0] and now - row[1] < self.ttl_seconds:
+            docs = json.loads(row[0])
+            self.l1_summaries[key] = (docs, row[1])
+            return docs
+        
+        return None
+    
+    def set_summaries(self, query: str, docs: List[Dict]):
+        """Attach summarized source dicts to a query's cached results (L1 + L2)."""
+        if self._is_time_sensitive(query):
+            return
+        
+        key = self._make_key(query)
+        
+        # Summaries share the TTL of the results they were produced from
+        cached_time = self.l1_cache[key][2] if key in self.l1_cache else time.time()
+        self.l1_summaries[key] = (docs, cached_time)
+        
+        conn = sqlite3.connect(str(self.db_path), timeout=5.0)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                "UPDATE qcache SET summaries = ? WHERE k = ?",
+                (json.dumps(docs), key)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
     def _prune_if_needed(self, cursor: sqlite3.Cursor, conn: sqlite3.Connection):
         """Prune cache if it exceeds max_rows."""
         cursor.execute("SELECT COUNT(*) FROM qcache")
@@ -298,6 +366,12 @@ class CacheManager:
             ]
             for k in expired_keys:
                 del self.l1_cache[k]
+            expired_keys = [
+                k for k, (_, cached_time) in self.l1_summaries.items()
+                if now - cached_time >= self.ttl_seconds
+            ]
+            for k in expired_keys:
+                del self.l1_summaries[k]
             
             return expired_count, old_count
         finally:
@@ -325,7 +399,7 @@ class CacheManager:
             old = cursor.fetchone()[0]
             
             # Cache size
-            cursor.execute("SELECT SUM(LENGTH(v)) FROM qcache")
+            cursor.execute("SELECT SUM(LENGTH(v) + COALESCE(LENGTH(summaries), 0)) FROM qcache")
             size_bytes = cursor.fetchone()[0] or 0
             
             return {
@@ -353,6 +427,7 @@ class CacheManager:
             conn.close()
         
         self.l1_cache.clear()
+        self.l1_summaries.clear()
 
 
 # Global cache manager instance
@@ -1,24 +1,88 @@
 from __future__ import annotations
-from typing import Dict, Optional, Tuple
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+import io
 import re
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 import markdown as md
-from urllib.parse import urlparse, urlunparse
+from urllib.parse import urlsplit, urlunsplit
 
+try:
+    # Optional faster renderer, with the plugins that stand in for Python-Markdown's "extra"
+    # (pip install 'deep-research-pro[fastmd]')
+    from markdown_it import MarkdownIt
+    from mdit_py_plugins.attrs import attrs_plugin
+    from mdit_py_plugins.deflist import deflist_plugin
+    from mdit_py_plugins.footnote import footnote_plugin
+except ImportError:
+    MarkdownIt = None
+
+# Precompiled patterns (hot in render_markdown)
+_SLUG_NONWORD = re.compile(r'[^\w\s-]')
+_SLUG_HYPHENS = re.compile(r'[-\s]+')
+# ASCII equivalent of the two patterns above as a translate table: keep word chars and hyphens,
+# turn whitespace into hyphens, drop everything else
+_SLUG_ASCII_TRANS = str.maketrans({
+    chr(c): ('-' if chr(c).isspace() else None)
+    for c in range(128)
+    if not (chr(c).isalnum() or chr(c) in '_-')
+})
+_SLUG_DASH_RUN = re.compile(r'-{2,}')
+# Markdown links: [text](url)
+_MD_LINK = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+# Common domain patterns in titles
+_DOMAIN_RE = re.compile(r'\b([a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.(?:com|org|net|edu|gov|io|co|pk|in|uk|au))\b')
+_SOURCE_PLACEHOLDER = re.compile(r'^source\d+$', re.IGNORECASE)
+_NUM_PREFIX = re.compile(r"^\d+[\.\)]\s*")
+# Cheap pre-check: text without any digit cannot contain a citation
+_HAS_DIGIT = re.compile(r'\d')
+# Units that mark a number as a measurement rather than a citation
+_MEASUREMENT_UNITS = (
+    'days', 'hours', 'minutes', 'seconds', 'years', 'months',
+    'degrees', 'percent', '%', 'km', 'miles', 'meters', 'feet',
+    'kg', 'pounds', 'tons', 'liters', 'gallons',
+)
+# A unit word (any case) right after a number, ending at whitespace, punctuation, or end of text;
+# one alternation instead of a startswith() test per unit and suffix
+_MEASURE_FOLLOW = (
+    r'\s*(?i:' + '|'.join(re.escape(unit) for unit in _MEASUREMENT_UNITS) + r')(?:[\s,.;]|$)'
+)
+# Citations in one scan: either a bracketed ID "[12]" (``bracketed`` group) or a standalone
+# 1-3 digit number that could be a bare citation (``bare`` group). All bare-number context rules
+# are encoded here so the whole scan runs in the regex engine:
+# - not glued to a word, hyphen, or underscore ("WeatherNext-2", "x_3")
+# - followed by whitespace, punctuation, or end of string (so not part of a larger number)
+# - not followed by a measurement unit ("15 days", "10 km,")
+# A preceding product name / version word ("Model 3", "version 2", "WeatherNext- 2", "v2 5")
+# is captured in the ``prefix`` group so the callback can leave the whole match untouched.
+_CITATION = re.compile(
+    r'\[(?P<bracketed>\d+)\]'
+    r'|(?P<prefix>(?<![a-zA-Z])[a-zA-Z]+(?:[\-_]\s*|\s+)|[vV]\d+\s+)?'
+    r'(?<![a-zA-Z\-_])\b(?P<bare>\d{1,3})\b(?=\s|[,.;:!?]|$)'
+    r'(?!' + _MEASURE_FOLLOW + r')'
+)
+
+@lru_cache(maxsize=1024)
 def _slugify(text: str) -> str:
     """Convert section title to anchor-friendly slug."""
     # Lowercase, replace spaces with hyphens, remove special chars
     slug = text.lower()
-    slug = re.sub(r'[^\w\s-]', '', slug)
-    slug = re.sub(r'[-\s]+', '-', slug)
+    if slug.isascii():
+        # Common case: one translate pass does both rewrites, then collapse hyphen runs
+        slug = _SLUG_DASH_RUN.sub('-', slug.translate(_SLUG_ASCII_TRANS))
+    else:
+        slug = _SLUG_NONWORD.sub('', slug)
+        slug = _SLUG_HYPHENS.sub('-', slug)
     return slug.strip('-')
 
 def _extract_url_from_markdown(text: str) -> Optional[str]:
     """Extract the first valid URL from markdown link syntax [text](url)."""
     if not text:
         return None
-    # Pattern to match markdown links: [text](url)
-    pattern = r'\[([^\]]+)\]\(([^)]+)\)'
-    matches = re.findall(pattern, text)
+    matches = _MD_LINK.findall(text)
     for _, url in matches:
         url = url.strip()
         # Remove query params that might be added by OpenAI (like ?utm_source=openai)
@@ -31,18 +95,15 @@ def _extract_url_from_markdown(text: str) -> Optional[str]:
 
 def _extract_domain_from_title_or_provider(title: str = "", provider: str = "") -> Optional[str]:
     """Try to extract domain from title or provider field."""
-    # Common domain patterns in titles
-    domain_pattern = r'\b([a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.(?:com|org|net|edu|gov|io|co|pk|in|uk|au))\b'
-    
     # Try title first
     if title:
-        match = re.search(domain_pattern, title.lower())
+        match = _DOMAIN_RE.search(title.lower())
         if match:
             return match.group(1)
     
     # Try provider
     if provider:
-        match = re.search(domain_pattern, provider.lower())
+        match = _DOMAIN_RE.search(provider.lower())
         if match:
             return match.group(1)
     
@@ -58,18 +119,42 @@ def _normalize_url(url: str, title: str = "", provider: str = "") -> tuple[str,
     if not url:
         return "#", "(No URL provided)"
     
+    # Fast path for the usual shape: a printable ASCII "https://host/..." with no query to clean,
+    # no brackets, and nothing to strip from either end
+    if (
+        url.startswith('https://')
+        and url[8:9] not in ('', '/', '#')
+        and url.isascii()
+        and url.isprintable()
+        and '?' not in url
+        and '[' not in url
+        and ']' not in url
+        and url[-1] not in '<> '
+    ):
+        return url, url
+    
     # Remove angle brackets
     original_url = url = url.strip('<>').strip()
     
+    # Parse once; scheme and netloc decide whether this is already a usable URL
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        # e.g. malformed IPv6 host
+        return "#", f"(Invalid URL: {original_url})"
+    
     # Check if it's already a valid URL
-    if url.startswith(('http://', 'https://')):
+    if parts.scheme in ('http', 'https') and parts.netloc:
         # Clean up query params that might be added by OpenAI
-        if '?' in url and 'utm_source=openai' in url:
-            url = url.split('?')[0]
+        if 'utm_source=openai' in parts.query:
+            url = urlunsplit(parts._replace(query=''))
+        elif not url.startswith(parts.scheme):
+            # Upper-case scheme ("HTTPS://..."); rebuild with the lower-cased one
+            url = urlunsplit(parts)
         return url, url
     
     # Check if it's a placeholder like "source1", "source2", etc.
-    if re.match(r'^source\d+$', url, re.IGNORECASE):
+    if _SOURCE_PLACEHOLDER.match(url):
         return "#", f"(Invalid URL: {original_url})"
     
     # Check if it's just a slug (like "pakistan-launches-diplomatic-campaign-to-counter-indias-aggression")
@@ -119,10 +204,124 @@ def _clean_heading_text(text: str) -> str:
         return ""
     cleaned = text.strip()
     cleaned = cleaned.lstrip("#").strip()
-    cleaned = re.sub(r"^\d+[\.\)]\s*", "", cleaned)
+    cleaned = _NUM_PREFIX.sub("", cleaned)
     return cleaned
 
-def render_markdown(report, source_index: Optional[Dict[int, any]] = None) -> str:  # type: ignore
+# Inline citation link: (url, citation id)
+_CITE_TEMPLATE = '<a href="%s">[%s]</a>'
+
+class SourceView(NamedTuple):
+    """Plain snapshot of the SourceItem fields render_markdown reads."""
+    url: str
+    title: str
+    provider: str
+    snippet: str
+    content: str
+
+def _source_view(source_item) -> SourceView:
+    """Read a SourceItem's fields once; missing attributes fall back to empty values."""
+    try:
+        url = source_item.url
+    except AttributeError:
+        # Bare values (e.g. a plain URL string) stand in for their own URL
+        url = str(source_item)
+    return SourceView(
+        url,
+        getattr(source_item, 'title', ""),
+        getattr(source_item, 'provider', ""),
+        getattr(source_item, 'snippet', "") or "",
+        getattr(source_item, 'content', "") or "",
+    )
+
+def _resolve_source_link(view: SourceView) -> Tuple[str, str]:
+    """Resolve a source's link once for both inline citations and the References block.
+    
+    Returns:
+        Tuple of (normalized_url, display_url); normalized_url is "#" when no usable URL exists
+    """
+    # Normalize URL
+    normalized_url, display_url = _normalize_url(view.url, view.title, view.provider)
+    
+    # If URL is invalid, try to extract from snippet, then content
+    if normalized_url == "#":
+        for text in (view.snippet, view.content):
+            extracted_url = _extract_url_from_markdown(text)
+            if extracted_url:
+                return extracted_url, extracted_url
+    return normalized_url, display_url
+
+def _write_citations(write: Callable[[str], object], text: str, cite_links: Dict[str, str]) -> None:
+    """Write text with bare and bracketed citation numbers rewritten into clickable links.
+    
+    Bracketed IDs "[N]" and bare IDs "N" (e.g. "6 7") both become <a href=...>[N]</a> directly.
+    Unknown IDs and bare numbers after a product/version word are left unchanged. Unchanged
+    spans are written straight into the caller's buffer rather than spliced by re.sub.
+    
+    Args:
+        write: Output buffer's write method
+        text: Section or subsection body
+        cite_links: Citation ID string -> precomputed <a> link
+    """
+    # First, normalize adjacent citations [4][5] to [4] [5] for proper spacing
+    text = text.replace('][', '] [')
+    # Prose-only text has no citations at all; skip the scan below
+    if not _HAS_DIGIT.search(text):
+        write(text)
+        return
+    
+    # Convert [1], [2], [10] and bare citation numbers (6 7) to clickable links in one pass
+    get_link = cite_links.get
+    last = 0
+    for match in _CITATION.finditer(text):
+        num_str = match.group('bracketed')
+        if num_str is None:
+            if match.group('prefix') is not None:
+                continue
+            num_str = match.group('bare')
+        link = get_link(num_str)
+        if link is None:
+            continue
+        start, end = match.span()
+        write(text[last:start])
+        write(link)
+        last = end
+    write(text[last:])
+
+# Collapsible References block around the reference lines (blank line after the heading)
+_REFERENCES_OPEN = (
+    "\n<details>\n"
+    "<summary><h2 style='display: inline; margin: 0;'>References</h2></summary>\n"
+    "\n"
+)
+_REFERENCES_CLOSE = "</details>\n"
+
+# Newline-terminated reference line templates keyed by (has_title, has_http_url)
+_REF_TEMPLATES = {
+    (True, True): '<p id="ref-{cid}">[{cid}] <a href="{url}" target="_blank" rel="noopener noreferrer">{title}</a></p>\n',
+    (True, False): '<p id="ref-{cid}">[{cid}] <a href="#ref-{cid}">{title}</a></p>\n',
+    (False, True): '<p id="ref-{cid}">[{cid}] <a href="{url}" target="_blank" rel="noopener noreferrer">{display}</a></p>\n',
+    (False, False): '<p id="ref-{cid}">[{cid}] {display}</p>\n',
+}
+
+def _reference_line(citation_id: int, title: str, link: Tuple[str, str]) -> str:
+    """Build one newline-terminated HTML reference line.
+    
+    Args:
+        citation_id: Numeric citation ID
+        title: Source title (may be empty)
+        link: (normalized_url, display_url) from _resolve_source_link
+    """
+    normalized_url, display_url = link
+    # Only title is clickable (as hyperlink); without a title, show URL or placeholder
+    template = _REF_TEMPLATES[(bool(title), normalized_url.startswith('http'))]
+    return template.format_map({
+        "cid": citation_id,
+        "url": normalized_url,
+        "title": title,
+        "display": display_url,
+    })
+
+def render_markdown(report, source_index: Optional[Dict[int, Any]] = None) -> str:
     """
     Render ResearchReport to markdown.
     
@@ -130,341 +329,189 @@ def render_markdown(report, source_index: Optional[Dict[int, any]] = None) -> st
         report: ResearchReport object
         source_index: Optional dict mapping numeric ID -> SourceItem (for deterministic citations)
     """
+    sections = report.sections
     main_heading = (report.topic or "").strip()
+    
+    # Nothing but a title: skip the TOC, citation and reference machinery entirely
+    if not sections and not report.notes:
+        return f"# {main_heading}\n"
+    
     first_section_clean_summary: Optional[str] = None
-    if report.sections:
-        heading_from_summary, cleaned = _extract_main_heading_and_clean_summary(report.sections[0].summary)
+    if sections:
+        heading_from_summary, cleaned = _extract_main_heading_and_clean_summary(sections[0].summary)
         if heading_from_summary:
             main_heading = heading_from_summary
             first_section_clean_summary = cleaned
-    lines = [f"# {main_heading}", ""]
+    # Write into one buffer; every line is newline-terminated as it is written and each block
+    # after the title starts with its separating blank line, so nothing has to be trimmed or
+    # joined at the end
+    buf = io.StringIO()
+    w = buf.write
+    w(f"# {main_heading}\n")
 
-    # Build references programmatically from Source Index using section.citations (IDs)
-    if source_index:
+    # Build references programmatically from Source Index using section.citations (IDs).
+    # Without sections there is nothing to link or cite.
+    if source_index and sections:
         # Use Source Index for deterministic citations
         id_to_source = source_index
         
-        # Collect all citation IDs from section.citations
-        all_citation_ids = set()
-        for sec in report.sections:
-            for citation_id in sec.citations:
-                if citation_id in id_to_source:
-                    all_citation_ids.add(citation_id)
+        # Snapshot each source's fields and resolve its URL once; inline citations and
+        # References both reuse (title, (normalized_url, display_url)) instead of probing the
+        # SourceItem again, with a single dict lookup per source
+        resolved: Dict[int, Tuple[str, Tuple[str, str]]] = {}
+        for cid, src in id_to_source.items():
+            view = _source_view(src)
+            resolved[cid] = (view.title, _resolve_source_link(view))
         
-        # Build reference map from Source Index (ID -> SourceItem)
-        ref_map: Dict[int, any] = {cid: id_to_source[cid] for cid in sorted(all_citation_ids)}
-    else:
-        # Fallback: If no source_index, can't render references properly
-        ref_map: Dict[int, any] = {}
+        # Inline citation links, keyed by the ID as it appears in text.
+        # Sources without a usable URL link to their entry in the References section.
+        cite_links: Dict[str, str] = {
+            str(cid): _CITE_TEMPLATE % (url if url != "#" else f"#ref-{cid}", cid)
+            for cid, (_, (url, _)) in resolved.items()
+        }
+
+    # Heading anchors are unique per document: a repeated heading gets "-1", "-2", ... suffixes,
+    # the same way markdown renderers disambiguate auto-generated heading ids
+    slug_counts: Dict[str, int] = {}
+    def unique_slug(text: str) -> str:
+        base = _slugify(text)
+        n = slug_counts.get(base, 0)
+        slug_counts[base] = n + 1
+        return base if n == 0 else f"{base}-{n}"
+    
+    # Count headings in document order so TOC links match the anchors of the rendered headings
+    unique_slug(main_heading)
+    if sections:
+        unique_slug("Table of Contents")
+    
+    # Clean each section heading and its anchor slug once; shared by the TOC and section emission
+    section_headings = []
+    for i, sec in enumerate(sections, 1):
+        heading_text = _clean_heading_text(sec.title)
+        # Untitled sections are rendered as "Section N"; anchor them the same way
+        slug = unique_slug(heading_text or f"Section {i}")
+        subsections = getattr(sec, 'subsections', None) or []
+        subsection_anchors = [(subsection.title, unique_slug(subsection.title)) for subsection in subsections]
+        section_headings.append((i, sec, heading_text, slug, subsection_anchors))
 
     # Table of Contents
-    if report.sections:
-        lines.append("## Table of Contents")
-        for i, sec in enumerate(report.sections, 1):
-            heading_text = _clean_heading_text(sec.title)
-            canonical_topic = (report.topic or "").strip().lower()
+    if sections:
+        w("\n## Table of Contents\n")
+        canonical_topic = (report.topic or "").strip().lower()
+        for i, sec, heading_text, slug, subsection_anchors in section_headings:
             if heading_text.lower() == main_heading.lower() or (
                 canonical_topic and heading_text.lower() == canonical_topic
             ):
                 continue
-            slug = _slugify(heading_text)
-            lines.append(f"- [{heading_text}](#{slug})")
+            w(f"- [{heading_text}](#{slug})\n")
             
             # Add subsections to TOC if they exist
-            if hasattr(sec, 'subsections') and sec.subsections:
-                for subsection in sec.subsections:
-                    subsection_title = subsection.title
-                    subsection_slug = _slugify(subsection_title)
-                    lines.append(f"  - [{subsection_title}](#{subsection_slug})")
-        lines.append("")
+            for subsection_title, subsection_slug in subsection_anchors:
+                w(f"  - [{subsection_title}](#{subsection_slug})\n")
 
+    # Citation IDs from section.citations, gathered while the sections are emitted so the
+    # References block needs no second walk over the report
+    cited_ids = set()
+    
     # Sections with inline citations already in text (no separate Citations line)
-    for i, sec in enumerate(report.sections, 1):
+    for i, sec, heading_text, _, _ in section_headings:
+        cited_ids.update(sec.citations)
+        
         # Create heading - markdown renderers will auto-create anchors from heading text
         # Use section title directly without numbering
-        heading_text = _clean_heading_text(sec.title)
         if not heading_text:
             heading_text = f"Section {i}"
-        lines.append(f"## {heading_text}")
+        w(f"\n## {heading_text}\n")
         
         # Replace inline citations [1], [2] with clickable links
         # Handle both [1] and [1][2] formats, ensuring proper spacing
-        summary_text = sec.summary.strip()
+        # str.strip() returns the same object when there is nothing to strip, so this only
+        # allocates for summaries that actually carry surrounding whitespace
         if i == 1 and first_section_clean_summary is not None:
             summary_text = first_section_clean_summary
+        else:
+            summary_text = sec.summary.strip()
         if source_index:
-            # First, normalize adjacent citations [4][5] to [4] [5] for proper spacing
-            summary_text = re.sub(r'\]\[', '] [', summary_text)
-            
-            # Also handle cases where citations might appear as bare numbers (6 7) and convert to [6] [7]
-            # Only wrap numbers that are valid citation IDs and appear in citation-like contexts
-            citation_ids = set(id_to_source.keys())
-            max_citation_id = max(citation_ids) if citation_ids else 0
-            
-            def wrap_bare_citation(match):
-                num_str = match.group(0)
-                try:
-                    num = int(num_str)
-                    # Only process if it's a valid citation ID and reasonably small (citations are usually < 50)
-                    if num in citation_ids and num <= max(50, max_citation_id):
-                        # Check if it's already in brackets (avoid double-wrapping)
-                        start = match.start()
-                        end = match.end()
-                        if start > 0 and end < len(summary_text):
-                            # Check if already wrapped in brackets
-                            if summary_text[start-1] == '[' and summary_text[end] == ']':
-                                return num_str  # Already wrapped
-                            # Check if it's part of a larger number or word
-                            if start > 0 and summary_text[start-1].isdigit():
-                                return num_str  # Part of larger number
-                            if end < len(summary_text) and summary_text[end].isdigit():
-                                return num_str  # Part of larger number
-                            
-                            # CRITICAL: Don't wrap numbers that are part of product names, versions, or measurements
-                            # Check preceding characters (look back up to 20 chars for context)
-                            lookback_start = max(0, start - 20)
-                            preceding_text = summary_text[lookback_start:start].lower()
-                            
-                            # Don't wrap if preceded by product name patterns:
-                            # - Letters followed by hyphen: "WeatherNext-", "Model-"
-                            # - Letters followed by space: "WeatherNext ", "Model "
-                            # - Common version/product words: "version", "v", "model", "release"
-                            if re.search(r'[a-z]+[-_]\s*$|[a-z]+\s+$|version\s+|v\d+\s*$|model\s+|release\s+', preceding_text):
-                                return num_str  # Part of product name or version
-                            
-                            # Check if followed by measurement units (don't wrap)
-                            following_text = summary_text[end:min(len(summary_text), end + 10)].lower()
-                            measurement_units = ['days', 'hours', 'minutes', 'seconds', 'years', 'months', 
-                                                'degrees', 'percent', '%', 'km', 'miles', 'meters', 'feet',
-                                                'kg', 'pounds', 'tons', 'liters', 'gallons']
-                            if any(following_text.strip().startswith(unit + ' ') or 
-                                   following_text.strip().startswith(unit + ',') or
-                                   following_text.strip().startswith(unit + '.') or
-                                   following_text.strip().startswith(unit + ';')
-                                   for unit in measurement_units):
-                                return num_str  # Part of measurement, not citation
-                            
-                            # Check immediate preceding character
-                            if start > 0:
-                                prev_char = summary_text[start-1]
-                                # Don't wrap if preceded by letter, hyphen, or underscore (product names)
-                                if prev_char.isalpha() or prev_char in ['-', '_']:
-                                    return num_str  # Part of name/version
-                        return f"[{num_str}]"
-                except (ValueError, TypeError):
-                    pass
-                return num_str
-            
-            # Pattern to match standalone numbers (1-3 digits) that could be citations
-            # Match numbers that are: at word boundaries, followed by space, punctuation, or end of string
-            # But not followed by another digit (to avoid matching parts of larger numbers)
-            # IMPORTANT: Only match numbers that are clearly citations, not part of product names, versions, or measurements
-            # Don't match if preceded by: letters, hyphens, underscores (product names like "WeatherNext-2", "Model 3")
-            # Don't match if followed by: units like "days", "hours", "degrees", etc.
-            summary_text = re.sub(r'(?<![a-zA-Z\-_])\b(\d{1,3})\b(?=\s|[,.;:!?]|$)', wrap_bare_citation, summary_text)
-            
-            # Find all citation patterns like [1], [2], [10] and convert to clickable links
-            def replace_citation(match):
-                citation_id_str = match.group(1)
-                try:
-                    citation_id = int(citation_id_str)
-                    if citation_id in id_to_source:
-                        source_item = id_to_source[citation_id]
-                        url = source_item.url if hasattr(source_item, 'url') else str(source_item)
-                        title = source_item.title if hasattr(source_item, 'title') else ""
-                        provider = source_item.provider if hasattr(source_item, 'provider') else ""
-                        
-                        # Normalize URL
-                        normalized_url, _ = _normalize_url(url, title, provider)
-                        
-                        # If URL is invalid, try to extract from summary text (if available)
-                        if normalized_url == "#":
-                            # Try snippet first
-                            if hasattr(source_item, 'snippet'):
-                                extracted_url = _extract_url_from_markdown(source_item.snippet or "")
-                                if extracted_url:
-                                    normalized_url = extracted_url
-                            # Try content if snippet didn't work
-                            if normalized_url == "#" and hasattr(source_item, 'content'):
-                                extracted_url = _extract_url_from_markdown(source_item.content or "")
-                                if extracted_url:
-                                    normalized_url = extracted_url
-                        
-                        # If still invalid, link to reference section
-                        if normalized_url == "#":
-                            normalized_url = f"#ref-{citation_id}"
-                        
-                        # Simple link without color highlighting
-                        return f'<a href="{normalized_url}">[{citation_id_str}]</a>'
-                except (ValueError, AttributeError):
-                    pass
-                return match.group(0)  # Return original if can't parse
-            
-            summary_text = re.sub(r'\[(\d+)\]', replace_citation, summary_text)
-        
-        lines.append(summary_text)
-        lines.append("")
+            _write_citations(w, summary_text, cite_links)
+        else:
+            w(summary_text)
+        w("\n")
         
         # Render subsections if they exist
-        if hasattr(sec, 'subsections') and sec.subsections:
-            for subsection in sec.subsections:
-                # Add H3 heading for subsection
-                subsection_title = subsection.title
-                lines.append(f"### {subsection_title}")
-                lines.append("")
-                
-                # Process subsection content with citations
-                subsection_content = subsection.content.strip()
-                if source_index:
-                    # Normalize adjacent citations
-                    subsection_content = re.sub(r'\]\[', '] [', subsection_content)
-                    
-                    # Wrap bare citations (same logic as for summary)
-                    citation_ids = set(id_to_source.keys())
-                    max_citation_id = max(citation_ids) if citation_ids else 0
-                    
-                    def wrap_bare_citation_sub(match):
-                        num_str = match.group(0)
-                        try:
-                            num = int(num_str)
-                            if num in citation_ids and num <= max(50, max_citation_id):
-                                start = match.start()
-                                end = match.end()
-                                if start > 0 and end < len(subsection_content):
-                                    # Check if already wrapped
-                                    if subsection_content[start-1] == '[' and subsection_content[end] == ']':
-                                        return num_str
-                                    # Check if part of larger number
-                                    if start > 0 and subsection_content[start-1].isdigit():
-                                        return num_str
-                                    if end < len(subsection_content) and subsection_content[end].isdigit():
-                                        return num_str
-                                    
-                                    # CRITICAL: Don't wrap numbers that are part of product names, versions, or measurements
-                                    lookback_start = max(0, start - 20)
-                                    preceding_text = subsection_content[lookback_start:start].lower()
-                                    
-                                    if re.search(r'[a-z]+[-_]\s*$|[a-z]+\s+$|version\s+|v\d+\s*$|model\s+|release\s+', preceding_text):
-                                        return num_str
-                                    
-                                    following_text = subsection_content[end:min(len(subsection_content), end + 10)].lower()
-                                    measurement_units = ['days', 'hours', 'minutes', 'seconds', 'years', 'months', 
-                                                        'degrees', 'percent', '%', 'km', 'miles', 'meters', 'feet',
-                                                        'kg', 'pounds', 'tons', 'liters', 'gallons']
-                                    if any(following_text.strip().startswith(unit + ' ') or 
-                                           following_text.strip().startswith(unit + ',') or
-                                           following_text.strip().startswith(unit + '.') or
-                                           following_text.strip().startswith(unit + ';')
-                                           for unit in measurement_units):
-                                        return num_str
-                                    
-                                    if start > 0:
-                                        prev_char = subsection_content[start-1]
-                                        if prev_char.isalpha() or prev_char in ['-', '_']:
-                                            return num_str
-                                return f"[{num_str}]"
-                        except (ValueError, TypeError):
-                            pass
-                        return num_str
-                    
-                    subsection_content = re.sub(r'(?<![a-zA-Z\-_])\b(\d{1,3})\b(?=\s|[,.;:!?]|$)', wrap_bare_citation_sub, subsection_content)
-                    
-                    # Replace citations with clickable links (reuse the same function logic)
-                    def replace_citation_sub(match):
-                        citation_id_str = match.group(1)
-                        try:
-                            citation_id = int(citation_id_str)
-                            if citation_id in id_to_source:
-                                source_item = id_to_source[citation_id]
-                                url = source_item.url if hasattr(source_item, 'url') else str(source_item)
-                                title = source_item.title if hasattr(source_item, 'title') else ""
-                                provider = source_item.provider if hasattr(source_item, 'provider') else ""
-                                
-                                normalized_url, _ = _normalize_url(url, title, provider)
-                                
-                                if normalized_url == "#":
-                                    if hasattr(source_item, 'snippet'):
-                                        extracted_url = _extract_url_from_markdown(source_item.snippet or "")
-                                        if extracted_url:
-                                            normalized_url = extracted_url
-                                    if normalized_url == "#" and hasattr(source_item, 'content'):
-                                        extracted_url = _extract_url_from_markdown(source_item.content or "")
-                                        if extracted_url:
-                                            normalized_url = extracted_url
-                                
-                                if normalized_url == "#":
-                                    normalized_url = f"#ref-{citation_id}"
-                                
-                                return f'<a href="{normalized_url}">[{citation_id_str}]</a>'
-                        except (ValueError, AttributeError):
-                            pass
-                        return match.group(0)
-                    
-                    subsection_content = re.sub(r'\[(\d+)\]', replace_citation_sub, subsection_content)
-                
-                lines.append(subsection_content)
-                lines.append("")
+        for subsection in getattr(sec, 'subsections', None) or ():
+            # Add H3 heading for subsection
+            subsection_title = subsection.title
+            w(f"\n### {subsection_title}\n\n")
+            
+            # Process subsection content with citations
+            subsection_content = subsection.content.strip()
+            if source_index:
+                _write_citations(w, subsection_content, cite_links)
+            else:
+                w(subsection_content)
+            w("\n")
 
     # Notes (may include next steps)
     if report.notes:
-        lines.append("## Notes")
+        w("\n## Notes\n")
         for n in report.notes:
-            lines.append(f"- {n}")
-        lines.append("")
-
-    # References: Build programmatically from Source Index (in dropdown)
-    if ref_map:
-        lines.append("<details>")
-        lines.append("<summary><h2 style='display: inline; margin: 0;'>References</h2></summary>")
-        lines.append("")  # Blank line after heading
+            w(f"- {n}\n")
+
+    # References: Build programmatically from Source Index (in dropdown), one line per cited
+    # source that exists in the Source Index, in ID order
+    if source_index and sections:
+        ref_html = [
+            _reference_line(cid, *resolved[cid])
+            for cid in sorted(resolved.keys() & cited_ids)
+        ]
+    else:
+        # Fallback: If no source_index, can't render references properly
+        ref_html = []
+    if ref_html:
         # Use Source Index: render as [id] title (title is hyperlink to URL)
-        # Each reference on its own line (one per line)
-        for citation_id, source_item in ref_map.items():
-            url = source_item.url if hasattr(source_item, 'url') else str(source_item)
-            title = source_item.title if hasattr(source_item, 'title') else ""
-            snippet = source_item.snippet if hasattr(source_item, 'snippet') else ""
-            provider = source_item.provider if hasattr(source_item, 'provider') else ""
-            
-            # Normalize URL
-            normalized_url, display_url = _normalize_url(url, title, provider)
-            
-            # If URL is invalid, try to extract from snippet or content
-            if normalized_url == "#":
-                # Try extracting from snippet
-                extracted_url = _extract_url_from_markdown(snippet or "")
-                if extracted_url:
-                    normalized_url = extracted_url
-                    display_url = extracted_url
-                else:
-                    # Try extracting from content if available
-                    if hasattr(source_item, 'content') and source_item.content:
-                        extracted_url = _extract_url_from_markdown(source_item.content)
-                        if extracted_url:
-                            normalized_url = extracted_url
-                            display_url = extracted_url
-            
-            # Add anchor ID for reference section
-            anchor_id = f"ref-{citation_id}"
-            
-            # Each reference on a new line (one per line, no inline formatting)
-            # Only title is clickable (as hyperlink)
-            if title:
-                if normalized_url.startswith('http'):
-                    # Title is clickable link to the URL
-                    lines.append(f'<p id="{anchor_id}">[{citation_id}] <a href="{normalized_url}" target="_blank" rel="noopener noreferrer">{title}</a></p>')
-                else:
-                    # Title links to reference anchor (no valid URL)
-                    lines.append(f'<p id="{anchor_id}">[{citation_id}] <a href="#{anchor_id}">{title}</a></p>')
-            else:
-                # No title available, show URL or placeholder
-                if normalized_url.startswith('http'):
-                    lines.append(f'<p id="{anchor_id}">[{citation_id}] <a href="{normalized_url}" target="_blank" rel="noopener noreferrer">{display_url}</a></p>')
-                else:
-                    lines.append(f'<p id="{anchor_id}">[{citation_id}] {display_url}</p>')
-        lines.append("</details>")
-        lines.append("")
+        # Each reference on its own line (one per line), wrapped in one write
+        w(_REFERENCES_OPEN + "".join(ref_html) + _REFERENCES_CLOSE)
+
+    return buf.getvalue()
+
+
+# Shared Markdown converters, configured once. markdown-it-py is preferred: it is several times
+# faster than Python-Markdown and render() keeps no state between calls. Raw HTML stays enabled
+# for the References <details> block; tables, fenced code, strikethrough, footnotes, definition
+# lists and inline attributes are on.
+# Python-Markdown is the fallback: its instance is reset between documents, and since it is
+# stateful, conversions (Gradio worker threads) are serialized.
+if MarkdownIt is not None:
+    _MDIT_RENDERER = (
+        MarkdownIt("commonmark", {"html": True})
+        .enable(["table", "strikethrough"])
+        .use(footnote_plugin)
+        .use(deflist_plugin)
+        .use(attrs_plugin)
+    )
+else:
+    _MDIT_RENDERER = None
+_MD_RENDERER = md.Markdown(extensions=["extra", "tables", "fenced_code"])
+_MD_LOCK = threading.Lock()
+# Python-Markdown "extra" syntax markdown-it has no plugin for: block attribute lists
+# ("## Title {#id}", "{: .class}" at the end of a line), abbreviations ("*[HTML]: ...") and
+# markdown inside HTML blocks (markdown="1"). Documents using any of it go to Python-Markdown.
+_PYMD_ONLY = re.compile(r'\{:?[ \t]*[#.][^}\n]*\}[ \t]*$|^\*\[[^\]\n]+\]:|\smarkdown=', re.MULTILINE)
 
-    return "\n".join(lines)
+
+def _pymd_to_html(markdown_text: str) -> str:
+    """Convert markdown with the shared Python-Markdown instance."""
+    with _MD_LOCK:
+        return _MD_RENDERER.reset().convert(markdown_text)
+
+
+@lru_cache(maxsize=32)
+def _markdown_to_html(markdown_text: str) -> str:
+    """Convert markdown with the shared renderer, memoized so re-exports of an unchanged report
+    (HTML then PDF, or repeated clicks) skip the conversion."""
+    if _MDIT_RENDERER is not None and not _PYMD_ONLY.search(markdown_text):
+        return _MDIT_RENDERER.render(markdown_text)
+    return _pymd_to_html(markdown_text)
 
 
 def render_html_from_markdown(markdown_text: str) -> str:
@@ -477,24 +524,11 @@ def render_html_from_markdown(markdown_text: str) -> str:
     Returns:
         HTML formatted string
     """
-    return md.markdown(
-        markdown_text or "",
-        extensions=["extra", "tables", "fenced_code"]
-    )
+    return _markdown_to_html(markdown_text or "")
 
 
-def render_html_with_styles(html_content: str) -> str:
-    """
-    Wrap HTML content with CSS styles for PDF export.
-    
-    Args:
-        html_content: HTML content to style
-        
-    Returns:
-        Complete HTML document with styles
-    """
-    styles = """
-    <style>
+# Print stylesheet for exported reports; static, so it is built once at import
+_PRINT_CSS = """
         @page {
             size: A4;
             margin: 2cm;
@@ -634,22 +668,162 @@ def render_html_with_styles(html_content: str) -> str:
         p[id^="ref-"]:last-of-type {
             border-bottom: none;
         }
-    </style>
     """
-    
-    return f"""<!DOCTYPE html>
+_STYLES = f"""
+    <style>{_PRINT_CSS}</style>
+    """
+
+# Complete HTML document around the rendered body, split at the body so each call is one concat.
+# Both variants are filled in from one template at import.
+_HTML_HEAD_TEMPLATE = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <title>Research Report</title>
-    {styles}
-</head>
+{head_extra}</head>
 <body>
-    {html_content}
+    """
+_HTML_HEAD = _HTML_HEAD_TEMPLATE.format(head_extra=f"    {_STYLES}\n")
+# Same document without the inline <style>; the PDF path applies the cached stylesheet instead
+_PDF_HTML_HEAD = _HTML_HEAD_TEMPLATE.format(head_extra="")
+_HTML_TAIL = """
 </body>
 </html>"""
 
 
+def render_html_with_styles(html_content: str) -> str:
+    """
+    Wrap HTML content with the report CSS into a standalone HTML document.
+    
+    PDF export applies the same CSS as a cached WeasyPrint stylesheet instead.
+    
+    Args:
+        html_content: HTML content to style
+        
+    Returns:
+        Complete HTML document with styles
+    """
+    return _HTML_HEAD + html_content + _HTML_TAIL
+
+
+# WeasyPrint's native dependencies; an OSError naming one of them means they are not installed
+_MISSING_LIB_RE = re.compile(r'lib(?:pango|cairo|gdk)')
+
+
+def _raise_missing_libs(err: OSError) -> None:
+    """Re-raise a missing-system-library OSError with install instructions."""
+    raise OSError(
+        "PDF export requires system libraries that are not installed.\n\n"
+        "On macOS, install them with Homebrew:\n"
+        "  brew install pango cairo gdk-pixbuf libffi\n\n"
+        "Then reinstall weasyprint:\n"
+        "  pip install --upgrade --force-reinstall weasyprint\n\n"
+        f"Original error: {err}"
+    )
+
+
+# Output buffer for PDF writes; beyond ~1 MiB larger buffers stop paying off
+_PDF_WRITE_BUFFER = 1 << 20
+
+
+# (HTML, CSS) classes from weasyprint, filled in by the first successful _weasyprint() call
+_WP: Optional[Tuple[type, type]] = None
+
+
+def _weasyprint() -> Tuple[type, type]:
+    """
+    Import weasyprint once per process and return its (HTML, CSS) classes.
+    
+    Failed imports are not cached, so a later export retries (e.g. after installing libraries).
+    
+    Raises:
+        ImportError: If weasyprint is not installed
+        OSError: If required system libraries are missing
+    """
+    global _WP
+    if _WP is None:
+        try:
+            from weasyprint import HTML, CSS
+        except ImportError:
+            raise ImportError(
+                "weasyprint is required for PDF export. Install it with: pip install weasyprint"
+            )
+        except OSError as e:
+            # Handle missing system libraries (libpango, libcairo, etc.)
+            if _MISSING_LIB_RE.search(str(e)):
+                _raise_missing_libs(e)
+            raise
+        _WP = (HTML, CSS)
+    return _WP
+
+
+@lru_cache(maxsize=1)
+def _print_stylesheet():
+    """Parse the print stylesheet into a WeasyPrint CSS object once per process."""
+    _, CSS = _weasyprint()
+    return CSS(string=_PRINT_CSS)
+
+
+# Images are recompressed and the PDF streams stay compressed to keep large reports small
+_PDF_OPTIONS = {"optimize_images": True, "jpeg_quality": 85, "uncompressed_pdf": False}
+
+
+def _layout_pdf(full_html: str):
+    """Lay out a complete HTML document into a WeasyPrint Document."""
+    HTML, _ = _weasyprint()
+    return HTML(string=full_html).render(stylesheets=[_print_stylesheet()], **_PDF_OPTIONS)
+
+
+def _write_pdf(full_html: str, output_path: str) -> None:
+    """
+    Lay out a complete HTML document and write it as a PDF.
+    
+    Runs in a PDF worker process (see _pdf_pool), so WeasyPrint and its native libraries are
+    loaded there rather than in the app process.
+    """
+    # Import first so import/library errors surface as-is, not through the handler below
+    _weasyprint()
+    
+    try:
+        # Writing streams through a 1 MiB buffer
+        document = _layout_pdf(full_html)
+        with open(output_path, 'wb', buffering=_PDF_WRITE_BUFFER) as pdf_file:
+            document.write_pdf(target=pdf_file, **_PDF_OPTIONS)
+    except OSError as e:
+        # Catch OSError during PDF generation (missing libraries)
+        if _MISSING_LIB_RE.search(str(e)):
+            _raise_missing_libs(e)
+        raise
+
+
+# PDF layout is single-threaded and CPU-bound; exports run in a small worker pool so they do
+# not hold up the UI thread. Workers are spawned, not forked: the app process is multi-threaded
+# (Gradio), and a forked child can inherit locks held by other threads. Created on first export.
+_PDF_POOL_WORKERS = 2
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+
+def _pdf_pool(broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+    """
+    Return the shared PDF worker pool, creating it on first use.
+    
+    Passing the pool that raised BrokenProcessPool replaces it with a fresh one (unless another
+    thread already did), so one crashed worker does not fail every later export.
+    """
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if broken is not None and _PDF_POOL is broken:
+            broken.shutdown(wait=False)
+            _PDF_POOL = None
+        if _PDF_POOL is None:
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=_PDF_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _PDF_POOL
+
+
 def render_pdf_from_markdown(markdown_text: str, output_path: str) -> str:
     """
     Convert markdown text to PDF.
@@ -666,48 +840,18 @@ def render_pdf_from_markdown(markdown_text: str, output_path: str) -> str:
         OSError: If required system libraries are missing
         Exception: If PDF generation fails
     """
-    try:
-        from weasyprint import HTML, CSS
-    except ImportError:
-        raise ImportError(
-            "weasyprint is required for PDF export. Install it with: pip install weasyprint"
-        )
-    except OSError as e:
-        # Handle missing system libraries (libpango, libcairo, etc.)
-        error_msg = str(e)
-        if "libpango" in error_msg or "libcairo" in error_msg or "libgdk" in error_msg:
-            raise OSError(
-                "PDF export requires system libraries that are not installed.\n\n"
-                "On macOS, install them with Homebrew:\n"
-                "  brew install pango cairo gdk-pixbuf libffi\n\n"
-                "Then reinstall weasyprint:\n"
-                "  pip install --upgrade --force-reinstall weasyprint\n\n"
-                f"Original error: {error_msg}"
-            )
-        raise
-    
     # Convert markdown to HTML
     html_content = render_html_from_markdown(markdown_text)
     
-    # Wrap with styles
-    full_html = render_html_with_styles(html_content)
+    # Wrap in the document shell; styles come from the pre-parsed stylesheet
+    full_html = _PDF_HTML_HEAD + html_content + _HTML_TAIL
     
+    # Lay out and write in a worker process; its exceptions are re-raised here. A dead worker
+    # breaks the whole pool, so rebuild it and retry the export once.
+    pool = _pdf_pool()
     try:
-        # Generate PDF
-        HTML(string=full_html).write_pdf(output_path)
-    except OSError as e:
-        # Catch OSError during PDF generation (missing libraries)
-        error_msg = str(e)
-        if "libpango" in error_msg or "libcairo" in error_msg or "libgdk" in error_msg:
-            raise OSError(
-                "PDF export requires system libraries that are not installed.\n\n"
-                "On macOS, install them with Homebrew:\n"
-                "  brew install pango cairo gdk-pixbuf libffi\n\n"
-                "Then reinstall weasyprint:\n"
-                "  pip install --upgrade --force-reinstall weasyprint\n\n"
-                f"Original error: {error_msg}"
-            )
-        raise
+        pool.submit(_write_pdf, full_html, output_path).result()
+    except BrokenProcessPool:
+        _pdf_pool(broken=pool).submit(_write_pdf, full_html, output_path).result()
     
     return output_path
-
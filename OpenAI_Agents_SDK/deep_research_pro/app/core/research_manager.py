@@ -24,14 +24,21 @@ Key Features:
 - Analytics tracking for efficiency metrics
 """
 
+import io
 import os
 import asyncio
-import traceback
+import logging
 import time
 
 import re
+import hashlib
+import heapq
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from itertools import islice
 from typing import Dict, List, AsyncGenerator, Optional, Tuple, Set
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 
 from openai import AsyncOpenAI
 from agents import trace, gen_trace_id
@@ -57,23 +64,128 @@ from app.core.render import render_markdown
 from app.schemas.analytics import EfficiencyMetrics, WaveStat
 from app.core.analytics_builder import build_analytics_payload
 from app.core.cache_manager import get_cache_manager
+from app.core.tokens import TOKEN_BUDGET, count_tokens, get_token_encoder
+
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:  # optional: fall back to exact content-prefix keys
+    MinHash = MinHashLSH = None
+
+try:
+    import numpy as np
+except ImportError:  # optional: fall back to the pure-Python SimHash loop
+    np = None
+
+try:
+    import ahocorasick
+except ImportError:  # optional: fall back to per-keyword substring scans
+    ahocorasick = None
+
+log = logging.getLogger(__name__)
 
 # Configuration constants
 MAX_WAVES = 3
 TOPK_PER_QUERY = 5
 MAX_SOURCES_FINAL = 25
+MAX_THEME_QUERIES = 32  # Queries scanned when deriving report subtopic themes
 
 # Rate limiting: Limit concurrent API calls to avoid hitting TPM limits
 # With 30K TPM limit, we want to be conservative
 MAX_CONCURRENT_SEARCHES = 3  # Process queries in smaller batches
 MAX_CONCURRENT_SUMMARIES = 5  # Limit parallel summarization
+MAX_CONCURRENT_FILES = 5  # Limit parallel file extraction + chunk summarization
+# Per-call token estimates for the TPM budget (app.core.tokens), on top of the tokens of the
+# query or source itself. Searches and summaries reserve prompt + expected output before taking
+# a semaphore slot; once the call returns, the reservation is reconciled with the usage the API
+# reports.
+# Search result summarizer: instructions and prompt template; one paragraph plus 5-10 key points
+SUMMARY_PROMPT_TOKENS = 350
+SUMMARY_OUTPUT_TOKENS = 700
+# Hosted web search: gpt-4o-mini bills the retrieved search context as a fixed 8,000-token input
+# block, plus the agent instructions; the output is a <=300 word summary and the results list
+SEARCH_PROMPT_TOKENS = 8000 + 250
+SEARCH_OUTPUT_TOKENS = 800
+
+# settings exposes a list; membership checks here use a set
+_SUPPORTED_EXTENSIONS = frozenset(ext.lower() for ext in SUPPORTED_FILE_TYPES)
+
+# Content near-duplicate detection (MinHash-LSH over word 5-gram shingles)
+_SHINGLE_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SHINGLE_SIZE = 5
+_MINHASH_NUM_PERM = 64
+_NEAR_DUP_THRESHOLD = 0.85
+_SIMHASH_MAX_DISTANCE = 3  # Hamming distance at which two SimHashes are a candidate pair
+
+# Topic parsing patterns
+_FOCUS_RE = re.compile(
+    r"(?:focus on|topics? like|including|such as|e\.g\.|for example)[:\s]+(.+)", re.IGNORECASE
+)
+_ARTICLE_RE = re.compile(r'^(the|a|an)\s+', re.IGNORECASE)
+
+# Citation, URL and title patterns (compiled once; used per source/section)
+_CITATION_RE = re.compile(r'\[(\d+)\]')
+_TURN_RE = re.compile(r'^turn@search\d+$', re.IGNORECASE)
+_SOURCE_RE = re.compile(r'^source\d+$', re.IGNORECASE)
+_WS_RE = re.compile(r'\s+')
+_TRAILING_SUFFIX_RE = re.compile(r'\s*[-–—]\s*(google|deepmind|developers?|blog|article|news)$')
+_PIPE_RE = re.compile(r'\s*\|.*$')
+_PAREN_RE = re.compile(r'\s*\(.*\)$')
+_PLACEHOLDER_TITLE_RE = re.compile(r'^(?:untitled\s*source|source\s*\d+|no\s*title|n/a)$', re.IGNORECASE)
+
+# Common theme keywords used to derive report subtopics from queries
+_THEME_KEYWORDS = {
+    "background": ["background", "definition", "what is", "overview", "introduction", "basics", "fundamentals"],
+    "statistics": ["statistics", "data", "numbers", "percentage", "rate", "survey", "study", "research"],
+    "trends": ["trend", "future", "forecast", "prediction", "outlook", "emerging", "upcoming"],
+    "case_studies": ["case study", "example", "instance", "use case", "real-world", "implementation"],
+    "risks": ["risk", "danger", "threat", "challenge", "problem", "issue", "concern"],
+    "limitations": ["limitation", "drawback", "disadvantage", "weakness", "constraint"],
+    "comparison": ["compare", "versus", "vs", "difference", "alternative", "vs", "versus"],
+    "adoption": ["adoption", "implementation", "deployment", "usage", "adoption rate"],
+    "benefits": ["benefit", "advantage", "pro", "strength", "positive"],
+}
+
+# Readable subtopic names for each theme
+_THEME_NAMES = {
+    "background": "Background & Fundamentals",
+    "statistics": "Statistics & Data",
+    "trends": "Future Trends & Outlook",
+    "case_studies": "Case Studies & Examples",
+    "risks": "Risks & Challenges",
+    "limitations": "Limitations & Constraints",
+    "comparison": "Comparisons & Alternatives",
+    "adoption": "Adoption & Implementation",
+    "benefits": "Benefits & Advantages",
+}
+
+
+def _build_theme_automaton():
+    """Build an Aho-Corasick automaton mapping each keyword to the themes it signals."""
+    if ahocorasick is None:
+        return None
+    keyword_themes: Dict[str, List[str]] = {}
+    for theme, keywords in _THEME_KEYWORDS.items():
+        for keyword in keywords:
+            # A keyword may signal several themes (e.g. "implementation")
+            themes = keyword_themes.setdefault(keyword, [])
+            if theme not in themes:
+                themes.append(theme)
+    automaton = ahocorasick.Automaton()
+    for keyword, themes in keyword_themes.items():
+        automaton.add_word(keyword, tuple(themes))
+    automaton.make_automaton()
+    return automaton
+
+
+_THEME_AUTOMATON = _build_theme_automaton()
+
 
 # Helper functions for cross-wave improvement tracking
 def _extract_citations_from_text(text: str) -> set[int]:
     """Extract all citation IDs from text (e.g., [1], [2][3])."""
     citations = set()
     # Match [1], [2], [10], etc.
-    matches = re.findall(r'\[(\d+)\]', text)
+    matches = _CITATION_RE.findall(text)
     for match in matches:
         try:
             citations.add(int(match))
@@ -81,27 +193,134 @@ def _extract_citations_from_text(text: str) -> set[int]:
             pass
     return citations
 
+def _is_tracking_param(param: str) -> bool:
+    """True for analytics query params (utm_*, fbclid) that don't change the page."""
+    key = param.split("=", 1)[0].lower()
+    return key.startswith("utm_") or key == "fbclid"
+
+
+def _canon_url(url: str) -> str:
+    """Canonical form of a URL for deduplication.
+    
+    Lowercases scheme and host and drops tracking query params, so e.g.
+    ``https://X.com/p?utm_source=a`` and ``https://x.com/p`` map to the same key.
+    Anything that doesn't parse as an absolute URL is returned unchanged.
+    """
+    if not url:
+        return url
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if not parts.netloc:
+        return url
+    query = "&".join(
+        p for p in parts.query.split("&") if p and not _is_tracking_param(p)
+    )
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path, query, parts.fragment)
+    )
+
+
+# Token counts keyed by a blake2b digest of the text, so cached entries don't keep
+# multi-KB prompt parts alive; insertion-ordered for LRU eviction
+_TOKEN_COUNT_CACHE: "OrderedDict[bytes, int]" = OrderedDict()
+_TOKEN_COUNT_CACHE_SIZE = 4096
+
+
+def _count_tokens_cached(text: str) -> int:
+    """Token count of text (tiktoken, or ~4 chars per token without it), memoized.
+    
+    Prompt parts such as summaries and query lists recur across waves and the writer
+    retry, so repeated counts skip the tokenizer pass.
+    """
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    count = _TOKEN_COUNT_CACHE.get(key)
+    if count is not None:
+        _TOKEN_COUNT_CACHE.move_to_end(key)
+        return count
+    count = count_tokens(text)
+    _TOKEN_COUNT_CACHE[key] = count
+    if len(_TOKEN_COUNT_CACHE) > _TOKEN_COUNT_CACHE_SIZE:
+        _TOKEN_COUNT_CACHE.popitem(last=False)
+    return count
+
+
+@lru_cache(maxsize=4096)
+def _norm_query_cached(q: str) -> str:
+    """Normalized cache key for a query; follow-up waves often repeat earlier queries."""
+    return q.lower().strip()
+
+
+def _content_shingles(content: str) -> List[str]:
+    """Word 5-gram shingles of the content; short texts become a single shingle."""
+    tokens = _SHINGLE_TOKEN_RE.findall(content.lower())
+    return [
+        " ".join(tokens[i:i + _SHINGLE_SIZE])
+        for i in range(max(len(tokens) - _SHINGLE_SIZE + 1, 1))
+    ]
+
+
+def _content_minhash(content: str) -> "MinHash":
+    """Build a MinHash signature from word 5-gram shingles of the content."""
+    mh = MinHash(num_perm=_MINHASH_NUM_PERM)
+    for shingle in _content_shingles(content):
+        mh.update(shingle.encode("utf-8"))
+    return mh
+
+
+def _simhash64(content: str) -> int:
+    """64-bit SimHash of the content's word 5-gram shingles, weighted by frequency.
+    
+    Near-identical texts (e.g. the same page fetched via differently tagged URLs) land
+    within a few bits of each other. Shingles rather than single words keep common words
+    from dominating the lanes; even so a close pair is only a candidate to be confirmed.
+    """
+    counts = Counter(_content_shingles(content))
+    if np is not None and counts:
+        # Vectorized: unpack each token's 8-byte digest into a (tokens x 64) bit matrix
+        # (MSB first), turn bits into +/-1 votes and weight them in one matrix product
+        digests = b"".join(
+            hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest() for token in counts
+        )
+        bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(counts), 8), axis=1)
+        weights = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+        lanes = weights @ (bits.astype(np.int64) * 2 - 1)
+        return int.from_bytes(np.packbits(lanes > 0).tobytes(), "big")
+    
+    lanes = [0] * 64
+    for token, weight in counts.items():
+        h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            if h >> bit & 1:
+                lanes[bit] += weight
+            else:
+                lanes[bit] -= weight
+    return sum(1 << bit for bit in range(64) if lanes[bit] > 0)
+
+
 def _word_count(text: str) -> int:
     """Count words in text (consistent with analytics_builder._safe_word_count)."""
     if not text:
         return 0
     return len(text.split())
 
-def _calculate_report_quality_score(report: ResearchReport) -> float:
+def _report_stats(report: ResearchReport) -> Tuple[int, Set[int], float]:
     """
-    Calculate a quality score for a report (0.0 to 1.0).
-    Factors: word count, section count, citation density, section length.
+    Walk a report's sections once and return (total_words, citation_ids, quality_score).
+    Citation IDs combine section.citations with [n] markers found in the summary text.
     """
     if not report.sections:
-        return 0.0
+        return 0, set(), 0.0
     
-    total_words = sum(_word_count(sec.summary or "") for sec in report.sections)
-    num_sections = len(report.sections)
-    all_citations = set()
+    total_words = 0
+    all_citations: Set[int] = set()
     for sec in report.sections:
+        summary = sec.summary or ""
+        total_words += _word_count(summary)
         all_citations.update(sec.citations)
-        all_citations.update(_extract_citations_from_text(sec.summary or ""))
-    
+        all_citations.update(_extract_citations_from_text(summary))
+    num_sections = len(report.sections)
     num_citations = len(all_citations)
     
     # Normalize factors (heuristic weights)
@@ -121,7 +340,14 @@ def _calculate_report_quality_score(report: ResearchReport) -> float:
         section_length_score * 0.2
     )
     
-    return quality
+    return total_words, all_citations, quality
+
+def _calculate_report_quality_score(report: ResearchReport) -> float:
+    """
+    Calculate a quality score for a report (0.0 to 1.0).
+    Factors: word count, section count, citation density, section length.
+    """
+    return _report_stats(report)[2]
 
 def _calculate_report_deltas(
     previous_report: Optional[ResearchReport],
@@ -133,31 +359,13 @@ def _calculate_report_deltas(
     Returns:
         (text_added, text_rewritten, citations_added, quality_change)
     """
+    # One pass per report covers words, citations and the quality score
+    curr_words, curr_citations, curr_quality = _report_stats(current_report)
     if previous_report is None:
         # First wave - everything is new
-        total_words = sum(_word_count(sec.summary or "") for sec in current_report.sections)
-        all_citations = set()
-        for sec in current_report.sections:
-            all_citations.update(sec.citations)
-            all_citations.update(_extract_citations_from_text(sec.summary or ""))
-        quality = _calculate_report_quality_score(current_report)
-        return total_words, 0, len(all_citations), quality
+        return curr_words, 0, len(curr_citations), curr_quality
     
-    # Calculate previous metrics
-    prev_words = sum(_word_count(sec.summary or "") for sec in previous_report.sections)
-    prev_citations = set()
-    for sec in previous_report.sections:
-        prev_citations.update(sec.citations)
-        prev_citations.update(_extract_citations_from_text(sec.summary or ""))
-    prev_quality = _calculate_report_quality_score(previous_report)
-    
-    # Calculate current metrics
-    curr_words = sum(_word_count(sec.summary or "") for sec in current_report.sections)
-    curr_citations = set()
-    for sec in current_report.sections:
-        curr_citations.update(sec.citations)
-        curr_citations.update(_extract_citations_from_text(sec.summary or ""))
-    curr_quality = _calculate_report_quality_score(current_report)
+    prev_words, prev_citations, prev_quality = _report_stats(previous_report)
     
     # Calculate deltas
     text_added = max(0, curr_words - prev_words)
@@ -179,6 +387,51 @@ def _calculate_report_deltas(
     
     return text_added, rewritten_words, citations_added, quality_change
 
+def _quick_invalid(report: ResearchReport) -> Optional[str]:
+    """
+    Return the first writer-output validation problem, or None if the report passes.
+    Stops at the first empty/too-short section or generic title; only a report whose
+    sections all pass is checked for total content length.
+    """
+    if not report.sections:
+        return "missing sections"
+    total_content_length = 0
+    for i, sec in enumerate(report.sections):
+        summary = sec.summary or ""
+        if len(summary.strip()) < 50:
+            return f"empty/too-short sections: [{i}]"
+        if sec.title and len(sec.title) < 10:
+            return f"generic section titles: [{i}]"
+        total_content_length += len(summary)
+    if total_content_length < 500:
+        return f"insufficient content (total: {total_content_length} chars)"
+    return None
+
+def _validation_issues(report: ResearchReport) -> List[str]:
+    """Full writer-output diagnostics: every empty/short section, generic title and content total."""
+    if not report.sections:
+        return ["missing sections"]
+    issues = []
+    empty_sections = []
+    generic_titles = []
+    total_content_length = 0
+    for i, sec in enumerate(report.sections):
+        summary = sec.summary or ""
+        title = sec.title
+        total_content_length += len(summary)
+        if len(summary.strip()) < 50:
+            empty_sections.append(i)
+        if title and len(title) < 10:
+            generic_titles.append(i)
+    if empty_sections:
+        issues.append(f"empty/too-short sections: {empty_sections}")
+    if generic_titles:
+        issues.append(f"generic section titles: {generic_titles}")
+    # Check if sections have meaningful content
+    if total_content_length < 500:
+        issues.append(f"insufficient content (total: {total_content_length} chars)")
+    return issues
+
 def _format_sources_for_writer(
     sources: List[SourceDoc],
     max_summary_length: int = 3000,
@@ -187,6 +440,11 @@ def _format_sources_for_writer(
     """
     Format sources for writer agent input.
     
+    When tiktoken is available, summaries are truncated by tokens (max_summary_length / 4,
+    the same ~4 chars per token estimate used elsewhere), encoding in one batch call only
+    the summaries whose stored token_estimate is missing or over budget; otherwise by
+    characters.
+    
     Args:
         sources: List of SourceDoc objects
         max_summary_length: Maximum length for summary text (default: 3000)
@@ -195,32 +453,249 @@ def _format_sources_for_writer(
     Returns:
         List of formatted summary strings
     """
+    # Use content (full detailed summary) if available, fallback to snippet
+    summary_texts = [src.content if src.content else (src.snippet or "") for src in sources]
+    
+    # Truncate very long summaries
+    encoding = get_token_encoder()
+    if encoding is not None and summary_texts:
+        max_tokens = max_summary_length // 4
+        # Sources summarized this run already carry their content's token count
+        to_check = [
+            i for i, src in enumerate(sources)
+            if not src.content or src.token_estimate is None or src.token_estimate > max_tokens
+        ]
+        encoded = encoding.encode_ordinary_batch([summary_texts[i] for i in to_check]) if to_check else []
+        for i, tokens in zip(to_check, encoded):
+            if len(tokens) > max_tokens:
+                if max_summary_length > 2000:
+                    # For longer limits, preserve structure
+                    summary_texts[i] = (
+                        f"{encoding.decode(tokens[:max_tokens - 50])}... [truncated] ..."
+                        f"{encoding.decode(tokens[-50:])}"
+                    )
+                else:
+                    # For shorter limits, simple truncation
+                    summary_texts[i] = f"{encoding.decode(tokens[:max_tokens - 5])}... [truncated]"
+    else:
+        # Each truncated summary is built in one f-string instead of chained concatenations
+        head_end = max_summary_length - 200 if max_summary_length > 2000 else max_summary_length - 20
+        for i, summary_text in enumerate(summary_texts):
+            if len(summary_text) > max_summary_length:
+                if max_summary_length > 2000:
+                    summary_texts[i] = f"{summary_text[:head_end]}... [truncated] ...{summary_text[-200:]}"
+                else:
+                    summary_texts[i] = f"{summary_text[:head_end]}... [truncated]"
+    
     formatted = []
-    for src in sources:
-        # Use content (full detailed summary) if available, fallback to snippet
-        summary_text = src.content if src.content else (src.snippet or "")
-        # Truncate very long summaries
-        if len(summary_text) > max_summary_length:
-            if max_summary_length > 2000:
-                # For longer limits, preserve structure
-                summary_text = summary_text[:max_summary_length - 200] + "... [truncated] ..." + summary_text[-200:]
-            else:
-                # For shorter limits, simple truncation
-                summary_text = summary_text[:max_summary_length - 20] + "... [truncated]"
-        
+    for src, summary_text in zip(sources, summary_texts):
         # Enhance title with context if requested
         title = src.title or "Untitled Source"
         if enhance_titles and len(title) < 40 and summary_text:
             # Extract key topic from summary for context
-            summary_words = summary_text.split()[:8]
+            summary_words = summary_text.split(None, 8)[:8]  # stop scanning after 8 words
             if summary_words:
-                topic_hint = " ".join(summary_words)
+                # Join only the words that can reach the 50-char hint budget
+                hint_words, hint_len = [], -1
+                for word in summary_words:
+                    if hint_len >= 50:
+                        break
+                    hint_words.append(word)
+                    hint_len += len(word) + 1
+                topic_hint = " ".join(hint_words)
                 title = f"{title} – {topic_hint[:50]}"
         
         formatted.append(f"Title: {title}\nURL: {src.url}\nSummary: {summary_text}")
     
     return formatted
 
+@lru_cache(maxsize=256)
+def _subtopics_from_topic(topic: str) -> Tuple[str, ...]:
+    """Cached core of ResearchManager._extract_subtopics_from_topic (pure in topic)."""
+    if not topic:
+        return ()
+    
+    # Common separators that indicate multiple subtopics
+    separators = [",", ";", ":", "|", "or", "and"]
+    
+    # Look for patterns like "Focus on topics like X, Y, or Z"
+    match = _FOCUS_RE.search(topic)
+    if match:
+        topic_part = match.group(1)
+        # Split by common separators
+        for sep in separators:
+            if sep in topic_part:
+                parts = [p.strip() for p in topic_part.split(sep) if p.strip()]
+                if len(parts) >= 2:
+                    # Clean up each part (remove leading articles, etc.)
+                    cleaned = []
+                    for p in parts:
+                        p = p.strip()
+                        # Remove leading "the", "a", "an" if present
+                        p = _ARTICLE_RE.sub('', p)
+                        if len(p) > 10:  # Only keep substantial subtopics
+                            cleaned.append(p)
+                    if cleaned:
+                        return tuple(cleaned[:7])  # Max 7 subtopics
+    
+    # Try splitting by comma if topic contains multiple parts
+    if "," in topic:
+        parts = [p.strip() for p in topic.split(",") if p.strip()]
+        if len(parts) >= 2:
+            # Check if parts look like subtopics (not just a list of words)
+            cleaned = []
+            for p in parts:
+                p = p.strip()
+                # Skip if it's too short or looks like a single word
+                if len(p) > 15 and " " in p:
+                    cleaned.append(p)
+            if len(cleaned) >= 2:
+                return tuple(cleaned[:7])
+    
+    return ()
+
+
+@lru_cache(maxsize=256)
+def _subtopic_themes(queries: Tuple[str, ...], topic: str) -> Tuple[str, ...]:
+    """Cached core of ResearchManager._extract_subtopic_themes (pure in its arguments)."""
+    if not queries:
+        # If no queries, try extracting from topic itself
+        if topic:
+            topic_subtopics = _subtopics_from_topic(topic)
+            if topic_subtopics:
+                return topic_subtopics
+        return ()
+    
+    # Count theme matches per query (each theme at most once per query)
+    theme_counts = {theme: 0 for theme in _THEME_KEYWORDS.keys()}
+    
+    for query_lower in [q.lower() for q in queries]:
+        if _THEME_AUTOMATON is not None:
+            # One linear scan finds every keyword in the query
+            matched = {theme for _, themes in _THEME_AUTOMATON.iter(query_lower) for theme in themes}
+        else:
+            matched = [
+                theme for theme, keywords in _THEME_KEYWORDS.items()
+                if any(keyword in query_lower for keyword in keywords)
+            ]
+        for theme in matched:
+            theme_counts[theme] += 1
+    
+    # Get top themes (at least 2 matches or top 5)
+    sorted_themes = sorted(
+        [(theme, count) for theme, count in theme_counts.items() if count > 0],
+        key=lambda x: x[1],
+        reverse=True
+    )
+    
+    # Return top 5-7 themes as subtopics
+    subtopics = [_THEME_NAMES[theme] for theme, _ in sorted_themes[:7]]
+    
+    # If we don't have enough themes, use first few queries as fallback
+    if len(subtopics) < 3:
+        subtopics.extend([q[:60] for q in queries[:5] if q not in subtopics])
+        subtopics = subtopics[:7]
+    
+    return tuple(subtopics)
+
+
+class _SharedCall:
+    """One in-flight call shared by concurrent callers with the same key (see _coalesced)."""
+
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+        self.waiters = 0
+
+
+class _BackgroundTasks:
+    """Tasks a run starts ahead of the point where it awaits them.
+    
+    Used as a context manager around the pipeline: any task still pending on exit (an
+    exception in between, or the run generator being closed early) is cancelled rather
+    than left running detached.
+    """
+
+    def __init__(self):
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self, coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        self._tasks.append(task)
+        return task
+
+    def __enter__(self) -> "_BackgroundTasks":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        for task in self._tasks:
+            if not task.done():
+                task.cancel()
+        self._tasks.clear()
+
+
+class _StatusLog(list):
+    """Status message list whose "\n\n"-joined text is built incrementally.
+    
+    Helpers append to it like a plain list; text() writes only the messages added since
+    the previous call to a running buffer instead of re-joining the whole log on every
+    yield.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._buf = io.StringIO()
+        self._flushed = 0
+
+    def text(self) -> str:
+        for msg in self[self._flushed:]:
+            if self._flushed:
+                self._buf.write("\n\n")
+            self._buf.write(msg)
+            self._flushed += 1
+        return self._buf.getvalue()
+
+
+class _TitleBlocks:
+    """Blocking index of seen titles for ResearchManager._titles_are_similar.
+    
+    Two titles can only pass that check by sharing a word of their normalized forms, or
+    through the substring rule, which needs both normalized forms longer than 20 chars.
+    candidates() returns just the keys that satisfy one of those, in insertion order, so
+    callers that stop at the first similar title behave exactly as with a full scan.
+    """
+
+    def __init__(self, normalize):
+        self._normalize = normalize
+        self._order: Dict[object, int] = {}
+        self._by_word: Dict[str, List[object]] = {}
+        self._long: List[Tuple[object, str]] = []  # (key, normalized) for the substring rule
+
+    def add(self, key, title: str) -> None:
+        if key in self._order:
+            return
+        self._order[key] = len(self._order)
+        norm = self._normalize(title)
+        for word in set(norm.split()):
+            self._by_word.setdefault(word, []).append(key)
+        if len(norm) > 20:
+            self._long.append((key, norm))
+
+    def candidates(self, title: str) -> List[object]:
+        norm = self._normalize(title)
+        if not norm:
+            return []
+        found = set()
+        for word in set(norm.split()):
+            found.update(self._by_word.get(word, ()))
+        if len(norm) > 20:
+            for key, seen_norm in self._long:
+                if norm in seen_norm or seen_norm in norm:
+                    found.add(key)
+        return sorted(found, key=self._order.__getitem__)
+
+
 class ResearchManager:
     """Orchestrates research pipeline: planning, search, file processing, follow-up, writing."""
 
@@ -252,7 +727,7 @@ class ResearchManager:
 
         # Caches
         self.cache_manager = get_cache_manager()
-        self.source_index: Dict[str, SourceDoc] = {}
+        self.source_index: Dict[str, SourceDoc] = {}  # canonical URL -> SourceDoc
 
         # Metrics for efficiency / analytics
         self.metrics_queries_executed = 0
@@ -266,9 +741,12 @@ class ResearchManager:
         # Get search provider
         self.web_search_async = get_search_provider_async("hosted")
         
-        # Rate limiting semaphores to prevent hitting TPM limits
+        # Rate limiting to prevent hitting TPM limits: semaphores cap concurrent calls and
+        # a shared budget holds back bursts of estimated tokens within any minute
         self.search_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
         self.summarize_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SUMMARIES)
+        # In-flight search/summary calls by key, so identical concurrent calls share one result
+        self._inflight: Dict[Tuple[str, str], _SharedCall] = {}
 
     # -----------------------------------------------------------
     # UTILITIES
@@ -276,7 +754,36 @@ class ResearchManager:
 
     def _norm_query(self, q: str) -> str:
         """Normalize queries for caching."""
-        return q.lower().strip()
+        return _norm_query_cached(q)
+    
+    async def _coalesced(self, key: Tuple[str, str], make_call):
+        """Await the in-flight call for key, or start make_call() if there is none.
+        
+        Concurrent callers with the same key share one call and its result (or exception).
+        A cancelled caller (e.g. a query cut off early) leaves the call running for the
+        others; once the last caller is gone, the call itself is cancelled so it stops
+        holding a concurrency slot and token budget. The entry is dropped as soon as the
+        call finishes or is abandoned.
+        """
+        call = self._inflight.get(key)
+        if call is None:
+            call = _SharedCall(asyncio.ensure_future(make_call()))
+            self._inflight[key] = call
+            call.future.add_done_callback(lambda _: self._drop_inflight(key, call))
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.future)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.future.done():
+                # Drop the entry first so a new caller starts a fresh call instead of
+                # joining the one being cancelled
+                self._drop_inflight(key, call)
+                call.future.cancel()
+    
+    def _drop_inflight(self, key: Tuple[str, str], call: _SharedCall) -> None:
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
     
     def _normalize_url(self, url: str) -> str:
         """Normalize and fix malformed URLs.
@@ -321,9 +828,9 @@ class ResearchManager:
         url = url.strip()
         
         # Check for placeholder patterns
-        if re.match(r'^turn@search\d+$', url, re.IGNORECASE):
+        if _TURN_RE.match(url):
             return False
-        if re.match(r'^source\d+$', url, re.IGNORECASE):
+        if _SOURCE_RE.match(url):
             return False
         if url == "#" or url.startswith("#ref-"):
             return False
@@ -345,12 +852,12 @@ class ResearchManager:
             return ""
         
         # Normalize whitespace and convert to lowercase
-        normalized = re.sub(r'\s+', ' ', title.strip().lower())
+        normalized = _WS_RE.sub(' ', title.strip().lower())
         
         # Remove common trailing patterns that don't affect uniqueness
-        normalized = re.sub(r'\s*[-–—]\s*(google|deepmind|developers?|blog|article|news)$', '', normalized)
-        normalized = re.sub(r'\s*\|.*$', '', normalized)  # Remove everything after |
-        normalized = re.sub(r'\s*\(.*\)$', '', normalized)  # Remove trailing parentheses
+        normalized = _TRAILING_SUFFIX_RE.sub('', normalized)
+        normalized = _PIPE_RE.sub('', normalized)  # Remove everything after |
+        normalized = _PAREN_RE.sub('', normalized)  # Remove trailing parentheses
         
         return normalized.strip()
     
@@ -400,87 +907,6 @@ class ResearchManager:
         similarity = len(intersection) / len(union)
         return similarity >= threshold
     
-    def _prepare_sources_for_ui(self, sources: List[SourceDoc]) -> List[List[str]]:
-        """Prepare sources for UI display with deduplication and URL validation.
-        
-        Args:
-            sources: List of SourceDoc objects
-            
-        Returns:
-            List of [title, url, type, published] lists, with:
-            - Invalid URLs shown as empty string (not displayed)
-            - Duplicate titles removed (keeps first occurrence with valid URL if available)
-            - Sources with empty/invalid titles filtered out
-        """
-        if not sources:
-            return []
-        
-        seen_titles = {}  # normalized_title -> (index, has_valid_url)
-        sources_data = []
-        
-        for src in sources:
-            title = (src.title or "").strip()
-            
-            # Skip sources with empty or very short titles (less than 3 characters)
-            # Also skip if title is just whitespace or common placeholders
-            if not title or len(title) < 3:
-                continue
-            
-            # Skip common placeholder titles
-            placeholder_patterns = [
-                r'^untitled\s*source$',
-                r'^source\s*\d+$',
-                r'^no\s*title$',
-                r'^n/a$',
-                r'^$',
-            ]
-            if any(re.match(pattern, title, re.IGNORECASE) for pattern in placeholder_patterns):
-                continue
-            
-            # Truncate long titles
-            if len(title) > 80:
-                title = title[:80] + "..."
-            
-            url = src.url or ""
-            source_type = src.source_type or "web"
-            published = src.published or "N/A"
-            
-            # Check if URL is valid
-            is_valid_url = self._is_valid_url(url)
-            
-            # Normalize title for deduplication
-            normalized_title = self._normalize_title_for_dedup(title)
-            
-            # Skip if normalized title is still empty (after removing suffixes)
-            if not normalized_title:
-                continue
-            
-            # Check for duplicates
-            is_duplicate = False
-            for seen_norm, (seen_idx, seen_has_url) in seen_titles.items():
-                if self._titles_are_similar(normalized_title, seen_norm):
-                    # If current has valid URL and seen doesn't, replace it
-                    if is_valid_url and not seen_has_url:
-                        # Replace the previous entry
-                        sources_data[seen_idx][1] = url  # Update URL
-                        seen_titles[seen_norm] = (seen_idx, True)
-                    # Otherwise, skip this duplicate
-                    is_duplicate = True
-                    break
-            
-            if is_duplicate:
-                continue
-            
-            # Add to seen titles
-            seen_titles[normalized_title] = (len(sources_data), is_valid_url)
-            
-            # Only include URL if it's valid, otherwise use empty string
-            display_url = url if is_valid_url else ""
-            
-            sources_data.append([title, display_url, source_type, published])
-        
-        return sources_data
-
     def _merge_sources(self, new_sources: List[SourceDoc], max_total: Optional[int] = None):
         """Merge sources into global index.
         
@@ -495,8 +921,8 @@ class ResearchManager:
         for src in new_sources:
             if max_total is not None and len(self.source_index) >= max_total:
                 break
-            if src.url not in self.source_index:
-                self.source_index[src.url] = src
+            # Single lookup; sources differing only by tracking params merge into one entry
+            if self.source_index.setdefault(_canon_url(src.url), src) is src:
                 merged_count += 1
         return merged_count
     
@@ -505,11 +931,28 @@ class ResearchManager:
         
         This ensures that the same source doesn't appear multiple times in the sources list
         presented to the writer agent, preventing duplicate references in the report.
+        
+        Content near-duplicates (boilerplate or templated pages under different titles) are
+        caught with MinHash-LSH when datasketch is installed; otherwise only sources whose
+        first 500 characters match (case-insensitively) are dropped.
+        A source with the same URL and first 1 KB of content as a kept one is dropped first.
         """
         seen_sources = {}  # (normalized_title, normalized_url) -> SourceDoc
+        # Only seen titles that can pass _titles_are_similar are compared
+        title_blocks = _TitleBlocks(self._normalize_title_for_dedup)
         filtered = []
-        
-        for src in sources:
+        lsh = (
+            MinHashLSH(threshold=_NEAR_DUP_THRESHOLD, num_perm=_MINHASH_NUM_PERM)
+            if MinHashLSH is not None else None
+        )
+        seen_content_keys: Set[str] = set()  # fallback when datasketch is unavailable
+        # (SimHash, MinHash) of kept sources, used only when datasketch is installed
+        seen_signatures: List[Tuple[int, "MinHash"]] = []
+        # (normalized_url, hash of the first 1 KB of content) of kept sources; a repeat is an
+        # exact duplicate and skips the title and near-duplicate checks entirely
+        seen_hashes: Set[Tuple[str, bytes]] = set()
+        
+        for idx, src in enumerate(sources):
             title = (src.title or "").strip()
             url = (src.url or "").strip()
             content = (src.content or src.snippet or "").strip()
@@ -519,13 +962,7 @@ class ResearchManager:
                 continue
             
             # Skip placeholder titles
-            placeholder_patterns = [
-                r'^untitled\s*source$',
-                r'^source\s*\d+$',
-                r'^no\s*title$',
-                r'^n/a$',
-            ]
-            if any(re.match(pattern, title, re.IGNORECASE) for pattern in placeholder_patterns):
+            if _PLACEHOLDER_TITLE_RE.match(title):
                 continue
             
             # Normalize title and URL for comparison
@@ -536,9 +973,20 @@ class ResearchManager:
             # Normalize URL (use empty string if invalid)
             normalized_url = url if self._is_valid_url(url) else ""
             
+            content_hash = None
+            if content:
+                content_hash = (
+                    normalized_url,
+                    hashlib.blake2b(content[:1024].encode("utf-8"), digest_size=8).digest(),
+                )
+                if content_hash in seen_hashes:
+                    continue
+            
             # Check for duplicates by title similarity and URL
             is_duplicate = False
-            for (seen_title, seen_url), seen_src in seen_sources.items():
+            replaced = False
+            for seen_title, seen_url in title_blocks.candidates(normalized_title):
+                seen_src = seen_sources[(seen_title, seen_url)]
                 # Check title similarity
                 if self._titles_are_similar(normalized_title, seen_title):
                     # If URLs match (both valid and same, or both invalid), it's a duplicate
@@ -550,8 +998,10 @@ class ResearchManager:
                     if normalized_url and not seen_url:
                         # Replace the seen one
                         seen_sources[(normalized_title, normalized_url)] = src
+                        title_blocks.add((normalized_title, normalized_url), normalized_title)
                         # Remove old entry from filtered list and add new one
                         filtered = [s for s in filtered if s != seen_src]
+                        replaced = True
                         break
                     # If seen has valid URL and current doesn't, skip current
                     if seen_url and not normalized_url:
@@ -561,8 +1011,34 @@ class ResearchManager:
             if is_duplicate:
                 continue
             
+            # Check for near-duplicate content. A replacement is exempt: it stands in for
+            # a source whose (similar) content is already registered.
+            if content:
+                if lsh is not None:
+                    mh = _content_minhash(content)
+                    simhash = _simhash64(content)
+                    if not replaced:
+                        # SimHash-close pairs are only candidates: each is confirmed by its
+                        # MinHash similarity, and an unconfirmed source still gets the LSH query
+                        if any(
+                            (simhash ^ seen_simhash).bit_count() <= _SIMHASH_MAX_DISTANCE
+                            and mh.jaccard(seen_mh) >= _NEAR_DUP_THRESHOLD
+                            for seen_simhash, seen_mh in seen_signatures
+                        ) or lsh.query(mh):
+                            continue
+                    seen_signatures.append((simhash, mh))
+                    lsh.insert(f"src-{idx}", mh)
+                else:
+                    content_key = content[:500].lower()
+                    if not replaced and content_key in seen_content_keys:
+                        continue
+                    seen_content_keys.add(content_key)
+            
             # Add to seen sources and filtered list
             seen_sources[(normalized_title, normalized_url)] = src
+            title_blocks.add((normalized_title, normalized_url), normalized_title)
+            if content_hash is not None:
+                seen_hashes.add(content_hash)
             filtered.append(src)
         
         return filtered
@@ -570,23 +1046,26 @@ class ResearchManager:
     def _filter_top_sources(self, sources: List[SourceDoc], top_k: int = 15) -> List[SourceDoc]:
         """Filter to top K unique sources, prioritizing those with richer content."""
         unique_sources = self._deduplicate_sources(sources)
-        # Sort by content length (richer sources first), then take top K
-        sorted_sources = sorted(
+        if np is not None and unique_sources:
+            # Lengths go into one int array; a stable argsort on the negated lengths gives the
+            # same order as the heap below (richer sources first, ties keep input order)
+            lens = np.fromiter(
+                (len(s.content or s.snippet or "") for s in unique_sources),
+                dtype=np.int64,
+                count=len(unique_sources),
+            )
+            order = np.argsort(-lens, kind="stable")[:max(top_k, 0)]
+            return [unique_sources[i] for i in order]
+        # Top K by content length (richer sources first); bounded heap, ties keep input order
+        return heapq.nlargest(
+            top_k,
             unique_sources,
             key=lambda s: len(s.content or s.snippet or ""),
-            reverse=True
         )
-        return sorted_sources[:top_k]
     
     def _estimate_token_count(self, text: str) -> int:
         """Estimate token count (rough approximation: ~4 chars per token for English)."""
-        try:
-            import tiktoken
-            encoding = tiktoken.encoding_for_model("gpt-4o")
-            return len(encoding.encode(text))
-        except ImportError:
-            # Fallback: rough estimate (4 chars per token)
-            return len(text) // 4
+        return _count_tokens_cached(text)
     
     def _extract_subtopics_from_topic(self, topic: str) -> List[str]:
         """Extract subtopics from topic string when it enumerates multiple topics.
@@ -602,50 +1081,11 @@ class ResearchManager:
         Returns:
             List of extracted subtopic strings, or empty list if none found
         """
-        if not topic:
-            return []
-        
-        # Common separators that indicate multiple subtopics
-        separators = [",", ";", ":", "|", "or", "and"]
-        
-        # Look for patterns like "Focus on topics like X, Y, or Z"
-        focus_pattern = r"(?:focus on|topics? like|including|such as|e\.g\.|for example)[:\s]+(.+)"
-        match = re.search(focus_pattern, topic, re.IGNORECASE)
-        if match:
-            topic_part = match.group(1)
-            # Split by common separators
-            for sep in separators:
-                if sep in topic_part:
-                    parts = [p.strip() for p in topic_part.split(sep) if p.strip()]
-                    if len(parts) >= 2:
-                        # Clean up each part (remove leading articles, etc.)
-                        cleaned = []
-                        for p in parts:
-                            p = p.strip()
-                            # Remove leading "the", "a", "an" if present
-                            p = re.sub(r'^(the|a|an)\s+', '', p, flags=re.IGNORECASE)
-                            if len(p) > 10:  # Only keep substantial subtopics
-                                cleaned.append(p)
-                        if cleaned:
-                            return cleaned[:7]  # Max 7 subtopics
-        
-        # Try splitting by comma if topic contains multiple parts
-        if "," in topic:
-            parts = [p.strip() for p in topic.split(",") if p.strip()]
-            if len(parts) >= 2:
-                # Check if parts look like subtopics (not just a list of words)
-                cleaned = []
-                for p in parts:
-                    p = p.strip()
-                    # Skip if it's too short or looks like a single word
-                    if len(p) > 15 and " " in p:
-                        cleaned.append(p)
-                if len(cleaned) >= 2:
-                    return cleaned[:7]
-        
-        return []
-
-    def _extract_subtopic_themes(self, queries: List[str], topic: str = "") -> List[str]:
+        return list(_subtopics_from_topic(topic))
+
+    def _extract_subtopic_themes(
+        self, queries: List[str], topic: str = "", max_queries: Optional[int] = None
+    ) -> List[str]:
         """Extract meaningful subtopic themes from queries for better report structure.
         
         Analyzes query text to identify common research angles and converts them into
@@ -665,70 +1105,17 @@ class ResearchManager:
         Args:
             queries: List of search query strings
             topic: Original research topic (used as fallback if queries are empty/generic)
+            max_queries: Optional cap on how many queries (from the start) are scanned
         
         Returns:
             List of theme names (top 5-7) sorted by frequency in queries
         
         Falls back to extracting from topic or query snippets if no themes are detected.
         """
-        if not queries:
-            # If no queries, try extracting from topic itself
-            if topic:
-                topic_subtopics = self._extract_subtopics_from_topic(topic)
-                if topic_subtopics:
-                    return topic_subtopics
-            return []
-        
-        # Common theme keywords
-        theme_keywords = {
-            "background": ["background", "definition", "what is", "overview", "introduction", "basics", "fundamentals"],
-            "statistics": ["statistics", "data", "numbers", "percentage", "rate", "survey", "study", "research"],
-            "trends": ["trend", "future", "forecast", "prediction", "outlook", "emerging", "upcoming"],
-            "case_studies": ["case study", "example", "instance", "use case", "real-world", "implementation"],
-            "risks": ["risk", "danger", "threat", "challenge", "problem", "issue", "concern"],
-            "limitations": ["limitation", "drawback", "disadvantage", "weakness", "constraint"],
-            "comparison": ["compare", "versus", "vs", "difference", "alternative", "vs", "versus"],
-            "adoption": ["adoption", "implementation", "deployment", "usage", "adoption rate"],
-            "benefits": ["benefit", "advantage", "pro", "strength", "positive"],
-        }
-        
-        # Count theme matches per query
-        theme_counts = {theme: 0 for theme in theme_keywords.keys()}
-        
-        for query_lower in [q.lower() for q in queries]:
-            for theme, keywords in theme_keywords.items():
-                if any(keyword in query_lower for keyword in keywords):
-                    theme_counts[theme] += 1
-        
-        # Convert to readable subtopic names
-        theme_names = {
-            "background": "Background & Fundamentals",
-            "statistics": "Statistics & Data",
-            "trends": "Future Trends & Outlook",
-            "case_studies": "Case Studies & Examples",
-            "risks": "Risks & Challenges",
-            "limitations": "Limitations & Constraints",
-            "comparison": "Comparisons & Alternatives",
-            "adoption": "Adoption & Implementation",
-            "benefits": "Benefits & Advantages",
-        }
-        
-        # Get top themes (at least 2 matches or top 5)
-        sorted_themes = sorted(
-            [(theme, count) for theme, count in theme_counts.items() if count > 0],
-            key=lambda x: x[1],
-            reverse=True
-        )
+        if max_queries is not None:
+            queries = queries[:max_queries]
         
-        # Return top 5-7 themes as subtopics
-        subtopics = [theme_names[theme] for theme, _ in sorted_themes[:7]]
-        
-        # If we don't have enough themes, use first few queries as fallback
-        if len(subtopics) < 3:
-            subtopics.extend([q[:60] for q in queries[:5] if q not in subtopics])
-            subtopics = subtopics[:7]
-        
-        return subtopics
+        return list(_subtopic_themes(tuple(queries), topic))
 
     # -----------------------------------------------------------
     # FILE HANDLING
@@ -763,7 +1150,7 @@ class ResearchManager:
         for fp in filepaths:
             fname = os.path.basename(fp)
             ext = os.path.splitext(fname)[1].lower()
-            if ext not in SUPPORTED_FILE_TYPES:
+            if ext not in _SUPPORTED_EXTENSIONS:
                 status_messages.append(f"❌ Unsupported file type: {fname}")
                 continue
             valid_files.append(fp)
@@ -772,29 +1159,36 @@ class ResearchManager:
         if not valid_files:
             return []
 
-        # Process all files in parallel
-        async def process_single_file(fp: str) -> Optional[SourceDoc]:
+        # Process files in parallel, bounded so large uploads don't saturate disk I/O and the API
+        file_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FILES)
+
+        async def process_single_file(fp: str) -> Tuple[Optional[SourceDoc], str]:
+            """Process one file and return (summary_doc, status_message)."""
             fname = os.path.basename(fp)
-            try:
-                summary_doc = await self.file_agent.process_file(fp)
-                status_messages.append(f"✅ Completed: {fname}")
-                return summary_doc
-            except Exception as e:
-                status_messages.append(f"❌ Error processing {fname}: {e}")
-                traceback.print_exc()
-                return None
+            async with file_semaphore:
+                try:
+                    summary_doc = await self.file_agent.process_file(fp)
+                    return summary_doc, f"✅ Completed: {fname}"
+                except Exception as e:
+                    log.exception("Error processing %s", fname)
+                    return None, f"❌ Error processing {fname}: {e}"
 
         # Launch all file processing tasks in parallel
         file_tasks = [process_single_file(fp) for fp in valid_files]
         results = await asyncio.gather(*file_tasks, return_exceptions=True)
         
-        # Filter out None and exceptions
+        # Merge statuses in upload order, then filter out None and exceptions
         summaries = []
-        for result in results:
-            if isinstance(result, Exception):
+        for fp, result in zip(valid_files, results):
+            if isinstance(result, BaseException):
+                status_messages.append(
+                    f"❌ Error processing {os.path.basename(fp)}: {type(result).__name__}: {result}"
+                )
                 continue
-            if result is not None:
-                summaries.append(result)
+            summary_doc, status = result
+            status_messages.append(status)
+            if summary_doc is not None:
+                summaries.append(summary_doc)
 
         return summaries
 
@@ -814,19 +1208,31 @@ class ResearchManager:
         
         async def summarize_with_semaphore(item: Tuple[SourceItem, Dict]) -> Optional[str]:
             """Summarize a single source item with semaphore protection."""
-            async with self.summarize_semaphore:
-                try:
-                    return await self.search_agent.summarize_result_async(item[0])
-                except Exception as e:
-                    print(f"Warning: Failed to summarize result {item[0].title}: {e}")
-                    return None
+            source_item = item[0]
+            
+            async def summarize_once() -> Optional[str]:
+                # Wait for TPM budget before taking a slot, so a throttled call doesn't hold one
+                reservation = await TOKEN_BUDGET.reserve(
+                    SUMMARY_PROMPT_TOKENS
+                    + _count_tokens_cached(f"{source_item.title}\n{source_item.url}\n{source_item.snippet}")
+                    + SUMMARY_OUTPUT_TOKENS
+                )
+                async with self.summarize_semaphore:
+                    return await self.search_agent.summarize_result_async(source_item, reservation=reservation)
+            
+            # Queries in the same wave often return the same page; summarize it once
+            try:
+                return await self._coalesced(("summary", _canon_url(source_item.url)), summarize_once)
+            except Exception as e:
+                print(f"Warning: Failed to summarize result {item[0].title}: {e}")
+                return None
         
         tasks = [summarize_with_semaphore(item) for item in source_items]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         summarized = []
         for (item, raw), summary in zip(source_items, results):
-            if isinstance(summary, Exception):
+            if isinstance(summary, BaseException):
                 print(f"Warning: Failed to summarize result {item.title}: {summary}")
                 content = item.snippet or ""
             else:
@@ -845,18 +1251,37 @@ class ResearchManager:
                 provider=raw.get("provider", "openai"),
             ))
         
+        # Count tokens once here (one batch call) so writer prep needn't re-tokenize
+        encoding = get_token_encoder()
+        if encoding is not None and summarized:
+            for doc, tokens in zip(summarized, encoding.encode_ordinary_batch([d.content for d in summarized])):
+                doc.token_estimate = len(tokens)
+        
         return summarized
 
+    def _cache_source_summaries(
+        self, nq: str, source_items: List[Tuple[SourceItem, Dict]], docs: List[SourceDoc]
+    ):
+        """Store summarized SourceDocs with the query's cached results.
+        
+        Skipped when any result fell back to its raw snippet (failed summarization), so a
+        transient error isn't pinned in the cache for the whole TTL.
+        """
+        if any(doc.content == item.snippet for (item, _), doc in zip(source_items, docs)):
+            return
+        self.cache_manager.set_summaries(nq, [doc.model_dump() for doc in docs])
+
     async def run_web_search(
         self, queries: List[str], status_messages: List[str], max_results_per_query: Optional[int] = None
     ) -> Tuple[List[SourceDoc], List[str]]:
         """Execute search pipeline: cache lookup, web search, summarization, deduplication.
         
         Processes all queries in parallel for maximum speed. For each query:
-        1. Check two-level cache (L1: in-memory, L2: SQLite)
+        1. Check two-level cache (L1: in-memory, L2: SQLite); a hit with stored
+           per-result summaries returns SourceDocs directly without any LLM calls
         2. If cache miss: Execute web search via WebSearchTool
         3. Parallel summarization of all results for the query
-        4. Convert to SourceDoc objects with full summaries
+        4. Convert to SourceDoc objects with full summaries (stored back in the cache)
         
         Args:
             queries: List of search query strings to execute
@@ -869,71 +1294,81 @@ class ResearchManager:
             - query_summaries: List of query-level summary strings for report context
         
         All queries are processed concurrently, and result summarization within each query
-        is also parallelized for optimal performance.
+        is also parallelized for optimal performance. Queries still running once the finished
+        ones cover the remaining max_sources capacity are cancelled.
         """
         # Use provided limit or default to self.topk
         effective_topk = max_results_per_query if max_results_per_query is not None else self.topk
-        unique_sources = []
+        final_sources = []
+        seen_urls = set()
         query_summaries = []
 
         async def process_single_query(q: str) -> Tuple[List[SourceDoc], Optional[str]]:
             """Process a single query and return (sources, query_summary)."""
-            # Use semaphore to limit concurrent searches
-            async with self.search_semaphore:
-                nq = self._norm_query(q)
-                status_messages.append(f"🔍 Searching: {q}")
-
-                self.metrics_queries_executed += 1
-                query_summary = None
-
-                # Check cache (L1 + L2)
-                cached = self.cache_manager.get(nq)
-                if cached:
-                    self.metrics_cache_hits += 1
-                    status_messages.append(f"↪ Cache hit for query: {q}")
-                    cached_results, cached_summary = cached
-                    # Store query-level summary if available
-                    if cached_summary:
-                        query_summary = f"Query: {q}\nSummary: {cached_summary}"
-                    # Convert cached dicts to SourceItem tuples for summarization
-                    # For cached results, we need to re-summarize to get full detailed summaries
-                    results_to_process = cached_results[:effective_topk]
-                    
-                    source_items = []
-                    for r in results_to_process:
-                        source_item = SourceItem(
-                            id=0,
-                            title=r.get("title", ""),
-                            url=r.get("url", ""),
-                            snippet=r.get("snippet", ""),
-                            date=r.get("published"),
+            nq = self._norm_query(q)
+            status_messages.append(f"🔍 Searching: {q}")
+
+            self.metrics_queries_executed += 1
+            query_summary = None
+
+            # Check cache (L1 + L2)
+            cached = self.cache_manager.get(nq)
+            if cached:
+                self.metrics_cache_hits += 1
+                status_messages.append(f"↪ Cache hit for query: {q}")
+                cached_results, cached_summary = cached
+                # Store query-level summary if available
+                if cached_summary:
+                    query_summary = f"Query: {q}\nSummary: {cached_summary}"
+                results_to_process = cached_results[:effective_topk]
+                
+                # Reuse per-result summaries stored with the cached results (no LLM calls)
+                stored_docs = self.cache_manager.get_summaries(nq)
+                if stored_docs and len(stored_docs) >= len(results_to_process):
+                    query_sources = [SourceDoc(**d) for d in stored_docs[:len(results_to_process)]]
+                    self.metrics_total_sources_seen += len(query_sources)
+                    return query_sources, query_summary
+                
+                # Otherwise convert cached dicts to SourceItem tuples and re-summarize
+                source_items = []
+                for r in results_to_process:
+                    source_item = SourceItem(
+                        id=0,
+                        title=r.get("title", ""),
+                        url=r.get("url", ""),
+                        snippet=r.get("snippet", ""),
+                        date=r.get("published"),
+                    )
+                    source_items.append((source_item, r))
+                
+                try:
+                    query_sources = await self._summarize_sources(source_items)
+                    self.metrics_total_sources_seen += len(query_sources)
+                    self._cache_source_summaries(nq, source_items, query_sources)
+                    return query_sources, query_summary
+                except Exception as e:
+                    status_messages.append(f"⚠️ Error during parallel summarization for cached results: {e}")
+                    return [], query_summary
+            else:
+                self.metrics_cache_misses += 1
+                # Perform web search
+                try:
+                    # Search, cache, summarize and cache the summaries as one shared call, so its
+                    # work is stored even when the caller that started it was cut off. Only the
+                    # search itself is gated here; summarization has its own semaphore, so one
+                    # query's summaries don't hold back the next query's search
+                    async def search_once() -> Tuple[Optional[str], List[SourceDoc]]:
+                        reservation = await TOKEN_BUDGET.reserve(
+                            SEARCH_PROMPT_TOKENS + _count_tokens_cached(q) + SEARCH_OUTPUT_TOKENS
                         )
-                        source_items.append((source_item, r))
-                    
-                    try:
-                        query_sources = await self._summarize_sources(source_items)
-                        self.metrics_total_sources_seen += len(query_sources)
-                        return query_sources, query_summary
-                    except Exception as e:
-                        status_messages.append(f"⚠️ Error during parallel summarization for cached results: {e}")
-                        return [], query_summary
-                else:
-                    self.metrics_cache_misses += 1
-                    # Perform web search
-                    try:
-                        summary, web_results = await self.web_search_async(q)
-                        # Store query-level summary
-                        if summary:
-                            query_summary = f"Query: {q}\nSummary: {summary}"
+                        async with self.search_semaphore:
+                            summary, web_results = await self.web_search_async(q, reservation=reservation)
                         # Store in cache (L1 + L2)
                         self.cache_manager.set(nq, web_results, summary)
                         
-                        # Limit to effective_topk
-                        web_results = web_results[:effective_topk]
-                        
-                        # Prepare source items for summarization
+                        # Prepare source items (limited to effective_topk) for summarization
                         source_items = []
-                        for r in web_results:
+                        for r in web_results[:effective_topk]:
                             source_item = SourceItem(
                                 id=0,
                                 title=r.get("title", ""),
@@ -945,37 +1380,67 @@ class ResearchManager:
                         
                         try:
                             query_sources = await self._summarize_sources(source_items)
-                            self.metrics_total_sources_seen += len(query_sources)
-                            return query_sources, query_summary
                         except Exception as e:
                             status_messages.append(f"⚠️ Error during parallel summarization: {e}")
-                            return [], query_summary
-                    except Exception as e:
-                        status_messages.append(f"❌ Error searching {q}: {e}")
-                        return [], None
+                            return summary, []
+                        self._cache_source_summaries(nq, source_items, query_sources)
+                        return summary, query_sources
+                    
+                    # A query repeated within the wave (same normalized form) shares one call
+                    summary, query_sources = await self._coalesced(("search", nq), search_once)
+                    # Store query-level summary
+                    if summary:
+                        query_summary = f"Query: {q}\nSummary: {summary}"
+                    self.metrics_total_sources_seen += len(query_sources)
+                    return query_sources, query_summary
+                except Exception as e:
+                    status_messages.append(f"❌ Error searching {q}: {e}")
+                    return [], None
 
-        # Process queries with controlled concurrency (semaphore handles batching)
-        query_tasks = [process_single_query(q) for q in queries]
-        query_results = await asyncio.gather(*query_tasks, return_exceptions=True)
+        # Process queries concurrently (semaphores bound searches and summarizations)
+        query_tasks = [asyncio.create_task(process_single_query(q)) for q in queries]
         
-        # Collect results
-        for result in query_results:
-            if isinstance(result, Exception):
+        # Stop waiting on slower queries once the finished ones already bring enough new
+        # URLs to fill the remaining source capacity; the rest are cancelled. With no capacity
+        # left to begin with, every query still runs to completion for its summary.
+        remaining_capacity = self.max_sources - len(self.source_index)
+        new_urls = set()
+        try:
+            if remaining_capacity > 0:
+                for next_done in asyncio.as_completed(query_tasks):
+                    try:
+                        query_sources, _ = await next_done
+                    except Exception:
+                        continue
+                    for src in query_sources:
+                        url_key = _canon_url(src.url)
+                        if url_key not in self.source_index:
+                            new_urls.add(url_key)
+                    if len(new_urls) >= remaining_capacity:
+                        break
+            else:
+                await asyncio.wait(query_tasks)
+        finally:
+            # Only queries still running are cancelled; finished ones keep their results
+            for task in query_tasks:
+                if not task.done():
+                    task.cancel()
+        await asyncio.gather(*query_tasks, return_exceptions=True)
+        
+        # Collect results of every query that finished (before or after the cutoff), deduplicating
+        # by URL as we go; query order decides which copy is kept
+        for task in query_tasks:
+            if task.cancelled() or task.exception() is not None:
                 continue
-            query_sources, q_summary = result
-            unique_sources.extend(query_sources)
+            query_sources, q_summary = task.result()
+            for src in query_sources:
+                url_key = _canon_url(src.url)
+                if url_key not in seen_urls:
+                    seen_urls.add(url_key)
+                    final_sources.append(src)
             if q_summary:
                 query_summaries.append(q_summary)
 
-        # Deduplicate
-        final_sources = []
-        seen_urls = set()
-
-        for src in unique_sources:
-            if src.url not in seen_urls:
-                final_sources.append(src)
-                seen_urls.add(src.url)
-
         return final_sources, query_summaries
 
     # -----------------------------------------------------------
@@ -993,7 +1458,7 @@ class ResearchManager:
         if approved_queries:
             queries = approved_queries
 
-        status_messages = []
+        status_messages = _StatusLog()
         
         # ----------- INITIALIZATION ----------
         start_time = time.monotonic()
@@ -1025,7 +1490,7 @@ class ResearchManager:
         recommended_source_count = None
         if not queries:
             status_messages.append("🔍 Generating search queries...")
-            yield ("", "\n\n".join(status_messages), None)
+            yield ("", status_messages.text(), None)
             query_response = await self.planner.generate_async(topic)
             queries = query_response.queries
             status_messages.append(f"✅ Generated {len(queries)} search queries")
@@ -1049,26 +1514,26 @@ class ResearchManager:
         trace_url = f"{TRACE_DASHBOARD}{trace_id}"
         status_messages.append(f"🔗 Trace: {trace_url}")
 
-        yield ("", "\n\n".join(status_messages), None)
+        yield ("", status_messages.text(), None)
 
-        with trace("Research trace", trace_id=trace_id):
+        with trace("Research trace", trace_id=trace_id), _BackgroundTasks() as background:
             # ----------- FILE SUMMARIES (WAVE 0) ----------
             if uploaded_files:
                 status_messages.append(f"📂 Found {len(uploaded_files)} user-uploaded file(s).")
-                yield ("", "\n\n".join(status_messages), None)
+                yield ("", status_messages.text(), None)
 
                 files_summaries = await self.process_uploaded_files(
                     uploaded_files, status_messages
                 )
                 merged_files = self._merge_sources(files_summaries, max_total=self.max_sources)
                 status_messages.append(f"📁 File processing completed. Merged {merged_files} file source(s).\n")
-                yield ("", "\n\n".join(status_messages), None)
+                yield ("", status_messages.text(), None)
 
             # ----------- MULTI-WAVE SEARCH ----------
             while wave <= waves_total:
                 wave_start_time = time.monotonic()
                 status_messages.append(f"🌊 Starting Wave {wave}/{waves_total}")
-                yield ("", "\n\n".join(status_messages), None)
+                yield ("", status_messages.text(), None)
 
                 # Track queries for this wave
                 wave_queries_count = len(queries)
@@ -1096,7 +1561,7 @@ class ResearchManager:
                     status_messages.append(f"📝 Executing {wave_queries_count} search queries for this wave...")
                 else:
                     status_messages.append(f"📝 Executing {wave_queries_count} follow-up queries for this wave...")
-                yield ("", "\n\n".join(status_messages), None)
+                yield ("", status_messages.text(), None)
                 
                 # Step 1 — Web search (pass max_results_per_query as parameter)
                 wave_sources, wave_query_summaries = await self.run_web_search(
@@ -1120,16 +1585,51 @@ class ResearchManager:
                 if current_total >= self.max_sources:
                     status_messages.append(f"✅ Wave {wave} complete: Merged {merged_count} new sources in {wave_duration:.1f}s")
                     status_messages.append(f"🧮 Total unique sources: {current_total} (reached limit of {self.max_sources})")
-                    yield ("", "\n\n".join(status_messages), None)
+                    yield ("", status_messages.text(), None)
                     # Stop searching if we've reached the limit
                     status_messages.append(f"✔ Source limit reached. Ending search waves.\n")
-                    yield ("", "\n\n".join(status_messages), None)
+                    yield ("", status_messages.text(), None)
                     break
                 else:
                     status_messages.append(f"✅ Wave {wave} complete: Merged {merged_count} new sources in {wave_duration:.1f}s")
                     status_messages.append(f"🧮 Total unique sources so far: {current_total} (limit: {self.max_sources})")
-                    yield ("", "\n\n".join(status_messages), None)
+                    yield ("", status_messages.text(), None)
                 
+                # Build findings text for follow-up decision
+                findings_sections: List[str] = []
+                findings_sections.append(f"Topic: {topic}")
+                findings_sections.append(f"Sources found: {len(self.source_index)}")
+
+                # Summaries of top sources discovered so far
+                source_lines = [
+                    f"{i}. {src.title} - {src.snippet[:160]}..."
+                    for i, src in enumerate(islice(self.source_index.values(), 10), 1)
+                ]
+                if source_lines:
+                    findings_sections.append("Recent sources (top 10):\n" + "\n".join(source_lines))
+
+                # Include prior queries so follow-up agent avoids duplicates
+                if all_queries_used:
+                    prior_query_lines = []
+                    for i, q in enumerate(all_queries_used[-20:], 1):
+                        prior_query_lines.append(f"{i}. {q}")
+                    findings_sections.append(
+                        "Previous queries already executed (avoid repeating unless narrowing a specific angle):\n"
+                        + "\n".join(prior_query_lines)
+                    )
+
+                findings_text = "\n\n".join(findings_sections) + "\n"
+
+                # Step 2 (started early) — the follow-up decision only depends on the sources
+                # and queries so far, not on the intermediate report, so run it concurrently
+                # with the intermediate draft below instead of after it
+                followup_task = background.start(
+                    self.followup_agent.decide_async(
+                        original_query=topic,
+                        findings_text=findings_text,
+                    )
+                )
+
                 # Generate intermediate report for cross-wave comparison
                 # Only if we have enough sources (at least 3) to make it meaningful
                 current_report = None
@@ -1141,7 +1641,7 @@ class ResearchManager:
                 if len(self.source_index) >= 3:
                     try:
                         # Prepare sources for intermediate report
-                        intermediate_sources = list(self.source_index.values())[:min(15, len(self.source_index))]
+                        intermediate_sources = list(islice(self.source_index.values(), 15))
                         filtered_intermediate = self._filter_top_sources(intermediate_sources, top_k=min(10, len(intermediate_sources)))
                         
                         # Format summaries for writer (simplified for intermediate reports)
@@ -1152,7 +1652,9 @@ class ResearchManager:
                         )
                         
                         # Generate intermediate report
-                        intermediate_subtopics = self._extract_subtopic_themes(all_queries_used, topic=topic)
+                        intermediate_subtopics = self._extract_subtopic_themes(
+                            all_queries_used, topic=topic, max_queries=MAX_THEME_QUERIES
+                        )
                         if not intermediate_subtopics:
                             intermediate_subtopics = [topic[:60]]
                         
@@ -1196,36 +1698,9 @@ class ResearchManager:
                 status_messages.append(
                     "🤔 Evaluating whether another research wave is needed based on current coverage and gaps..."
                 )
-                yield ("", "\n\n".join(status_messages), None)
+                yield ("", status_messages.text(), None)
 
-                # Build findings text for follow-up decision
-                findings_sections: List[str] = []
-                findings_sections.append(f"Topic: {topic}")
-                findings_sections.append(f"Sources found: {len(self.source_index)}")
-
-                # Summaries of top sources discovered so far
-                source_lines = []
-                for i, src in enumerate(list(self.source_index.values())[:10], 1):
-                    source_lines.append(f"{i}. {src.title} - {src.snippet[:160]}...")
-                if source_lines:
-                    findings_sections.append("Recent sources (top 10):\n" + "\n".join(source_lines))
-
-                # Include prior queries so follow-up agent avoids duplicates
-                if all_queries_used:
-                    prior_query_lines = []
-                    for i, q in enumerate(all_queries_used[-20:], 1):
-                        prior_query_lines.append(f"{i}. {q}")
-                    findings_sections.append(
-                        "Previous queries already executed (avoid repeating unless narrowing a specific angle):\n"
-                        + "\n".join(prior_query_lines)
-                    )
-
-                findings_text = "\n\n".join(findings_sections) + "\n"
-
-                followup = await self.followup_agent.decide_async(
-                    original_query=topic,
-                    findings_text=findings_text,
-                )
+                followup = await followup_task
 
                 # Dedupe follow-up queries against all prior queries
                 prev_queries_norm = {q.lower().strip() for q in all_queries_used if q}
@@ -1266,12 +1741,12 @@ class ResearchManager:
                     status_messages.append(
                         "✔ No genuinely new follow-up queries remained after deduplication. Ending search waves.\n"
                     )
-                    yield ("", "\n\n".join(status_messages), None)
+                    yield ("", status_messages.text(), None)
                     break
 
                 if not followup.should_follow_up or wave == waves_total:
                     status_messages.append(f"✔ No more follow-ups required. Ending search waves.\n")
-                    yield ("", "\n\n".join(status_messages), None)
+                    yield ("", status_messages.text(), None)
                     break
 
                 queries = new_followup_queries
@@ -1279,13 +1754,13 @@ class ResearchManager:
                 status_messages.append(
                     f"🔄 Follow-up queries generated: using {len(queries)} new query(ies) (after dropping duplicates)."
                 )
-                yield ("", "\n\n".join(status_messages), None)
+                yield ("", status_messages.text(), None)
 
             # ----------- FINAL WRITING ----------
             status_messages.append("✍️ Writing final long-form report...")
-            yield ("", "\n\n".join(status_messages), None)
+            yield ("", status_messages.text(), None)
 
-            all_sources_list = list(self.source_index.values())[:self.max_sources]
+            all_sources_list = list(islice(self.source_index.values(), self.max_sources))
             
             # Filter and deduplicate sources before writing
             # Use max_sources for filtering, but ensure we don't exceed it
@@ -1301,7 +1776,9 @@ class ResearchManager:
             )
 
             # Extract meaningful subtopic themes from queries for better report structure
-            subtopic_themes = self._extract_subtopic_themes(all_queries_used, topic=topic)
+            subtopic_themes = self._extract_subtopic_themes(
+                all_queries_used, topic=topic, max_queries=MAX_THEME_QUERIES
+            )
             if not subtopic_themes:
                 # Fallback 1: Try extracting from topic itself if it enumerates subtopics
                 topic_subtopics = self._extract_subtopics_from_topic(topic)
@@ -1318,21 +1795,31 @@ class ResearchManager:
             status_messages.append(f"📋 Report structure themes: {', '.join(subtopic_themes[:5])}")
             
             # Prepare query-level summaries for prompt (truncate if too long)
-            query_level_summaries_text = ""
-            if all_query_summaries:
-                query_level_summaries_text = "\n\n".join(all_query_summaries)
-                # Limit query summaries to reasonable length
-                if len(query_level_summaries_text) > 5000:
-                    query_level_summaries_text = query_level_summaries_text[:4500] + "... [truncated]"
+            # Limit query summaries to reasonable length; stop collecting once the joined
+            # length passes the limit rather than joining every summary and slicing after
+            query_summary_parts: List[str] = []
+            joined_length = -2  # no separator before the first part
+            for query_summary in all_query_summaries:
+                query_summary_parts.append(query_summary)
+                joined_length += len(query_summary) + 2
+                if joined_length > 5000:
+                    break
+            query_level_summaries_text = "\n\n".join(query_summary_parts)
+            if joined_length > 5000:
+                query_level_summaries_text = query_level_summaries_text[:4500] + "... [truncated]"
 
             # Estimate token count for final prompt and log if needed
             prompt_parts = [
                 topic,
                 " ".join(subtopic_themes),
                 query_level_summaries_text,
-                "\n".join(summaries),
+                *summaries,
             ]
-            estimated_prompt_tokens = self._estimate_token_count("\n\n".join(prompt_parts))
+            # Sum cached per-part counts instead of re-tokenizing the concatenation; each
+            # summary is counted on its own (+1 token per "\n\n" or "\n" separator)
+            estimated_prompt_tokens = (
+                sum(self._estimate_token_count(part) for part in prompt_parts) + len(prompt_parts) - 1
+            )
             if estimated_prompt_tokens > 10000:
                 status_messages.append(
                     f"⚠️ Writer prompt is long (~{estimated_prompt_tokens} tokens). "
@@ -1348,6 +1835,10 @@ class ResearchManager:
                 query_level_summaries=query_level_summaries_text,
             )
             
+            # Enhanced validation of structured output; any single issue triggers the retry,
+            # so stop at the first one (full diagnostics only go to the debug log)
+            validation_issue = _quick_invalid(final_report)
+            
             # Calculate deltas for final report only if we haven't already calculated them
             # (i.e., if the final report is different from the last intermediate report)
             # The final report uses more sources, so it may have improvements
@@ -1371,38 +1862,22 @@ class ResearchManager:
                         wave_quality_change_score=final_quality_change,
                     )
             
-            # Enhanced validation of structured output
-            validation_issues = []
-            if not final_report.sections:
-                validation_issues.append("missing sections")
-            else:
-                # Check for quality issues
-                empty_sections = [i for i, sec in enumerate(final_report.sections) if not sec.summary or len(sec.summary.strip()) < 50]
-                if empty_sections:
-                    validation_issues.append(f"empty/too-short sections: {empty_sections}")
-                
-                generic_titles = [i for i, sec in enumerate(final_report.sections) if sec.title and len(sec.title) < 10]
-                if generic_titles:
-                    validation_issues.append(f"generic section titles: {generic_titles}")
-                
-                # Check if sections have meaningful content
-                total_content_length = sum(len(sec.summary or "") for sec in final_report.sections)
-                if total_content_length < 500:
-                    validation_issues.append(f"insufficient content (total: {total_content_length} chars)")
-            
-            if validation_issues:
+            if validation_issue:
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(
+                        "Writer output validation issues: %s",
+                        ", ".join(_validation_issues(final_report)),
+                    )
                 status_messages.append(
-                    f"⚠️ Writer output validation issues: {', '.join(validation_issues)}. "
+                    f"⚠️ Writer output validation issues: {validation_issue}. "
                     f"Retrying with simplified prompt..."
                 )
                 # Fallback: retry with simplified approach
-                simplified_sources = filtered_sources[:10]
-                simplified_summaries = summaries[:10]
                 final_report = await self.writer.draft_async(
                     topic=topic,
                     subtopics=subtopic_themes[:5],  # Use fewer subtopics
-                    summaries=simplified_summaries,  # Use fewer summaries
-                    sources=simplified_sources,  # Use fewer sources
+                    summaries=list(islice(summaries, 10)),  # Use fewer summaries
+                    sources=list(islice(filtered_sources, 10)),  # Use fewer sources
                     query_level_summaries=query_level_summaries_text[:1000] if query_level_summaries_text else "",
                 )
                 
@@ -1417,8 +1892,12 @@ class ResearchManager:
 
             # Render markdown
             # Build source index for citations (use filtered sources for final report)
-            id_to_source = {i+1: src for i, src in enumerate(filtered_sources)}
-            md = render_markdown(final_report, source_index=id_to_source)
+            id_to_source = dict(enumerate(filtered_sources, 1))
+            # Rendering is independent of the summary/analytics work below, so run it
+            # in a worker thread and collect it just before the final yield
+            md_task = background.start(
+                asyncio.to_thread(render_markdown, final_report, id_to_source)
+            )
 
             # Calculate total duration
             total_duration = time.monotonic() - start_time
@@ -1465,8 +1944,10 @@ class ResearchManager:
                 efficiency=efficiency,
             )
 
+            md = await md_task
+
             # Yield final report without sources_data (references are in the report markdown)
-            yield (md, "\n\n".join(status_messages), analytics)
+            yield (md, status_messages.text(), analytics)
 
     # -----------------------------------------------------------
     # PLANNING WRAPPER
@@ -2,13 +2,22 @@
 from agents import Runner
 from openai import RateLimitError
 from app.core.retry import with_retry
+from app.core.tokens import TOKEN_BUDGET
 
-async def safe_run_async(agent, prompt, output_type):
-    """Async wrapper for Runner.run with error handling and rate limit retry."""
+async def safe_run_async(agent, prompt, output_type, reservation=None):
+    """Async wrapper for Runner.run with error handling and rate limit retry.
+    
+    Callers that already reserved TPM budget for the call pass the reservation;
+    otherwise one is taken here from the instructions and prompt.
+    """
+    if reservation is None:
+        instructions = agent.instructions if isinstance(agent.instructions, str) else ""
+        reservation = await TOKEN_BUDGET.reserve_call(instructions, prompt)
     
     async def _run_agent():
         """Inner function to run the agent (for retry wrapper)."""
         res = await Runner.run(agent, input=prompt)
+        TOKEN_BUDGET.reconcile(reservation, res.context_wrapper.usage.total_tokens)
         return res.final_output_as(output_type)
     
     # Use retry wrapper to handle rate limits and connection errors
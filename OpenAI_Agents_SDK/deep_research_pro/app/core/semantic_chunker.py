@@ -3,6 +3,8 @@
 from typing import List
 from openai import AsyncOpenAI
 
+from app.core.tokens import TOKEN_BUDGET
+
 TARGET_CHUNK_SIZE = 1800
 MIN_CHUNK_SIZE = 900
 OVERLAP = 150
@@ -30,11 +32,13 @@ class SemanticChunker:
             Return format:
             [12, 89, 150, 2300, ...]
             """
+        reservation = await TOKEN_BUDGET.reserve_call(prompt)
         response = await self.client.chat.completions.create(
             model=self.model_name,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.0,
         )
+        TOKEN_BUDGET.reconcile(reservation, response.usage.total_tokens if response.usage else None)
 
 
 
@@ -8,6 +8,8 @@ load_dotenv(dotenv_path=Path(".env"))
 
 PROJECT_NAME = os.getenv("PROJECT_NAME", "Deep Research Pro")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # optional check in run.py
+# Tokens-per-minute budget shared by every LLM call in the process; unset or 0 disables it
+OPENAI_TPM_LIMIT = int(os.getenv("OPENAI_TPM_LIMIT") or "0")
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -0,0 +1,120 @@
+"""
+Token counting shared by the research pipeline and the writer agent.
+Uses tiktoken's gpt-4o encoding when available, otherwise ~4 characters per token.
+
+Also holds the process-wide tokens-per-minute budget (OPENAI_TPM_LIMIT) that every
+LLM call reserves against; it is disabled unless the limit is set.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import List, Optional
+
+from app.core.settings import OPENAI_TPM_LIMIT
+
+log = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def get_token_encoder():
+    """Load the gpt-4o tiktoken encoder once; None if tiktoken is not installed.
+
+    The encoding file is downloaded on first use; if that fails (e.g. offline), token
+    counts fall back to the character estimate as well.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model("gpt-4o")
+    except Exception as e:
+        log.warning("tiktoken encoding unavailable, estimating tokens from length: %s", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text; special-token strings in scraped content count as plain text."""
+    encoding = get_token_encoder()
+    if encoding is not None:
+        return len(encoding.encode_ordinary(text))
+    # Fallback: rough estimate (4 chars per token)
+    return len(text) // 4
+
+
+# Output allowance for calls that don't pass their own estimate
+DEFAULT_OUTPUT_TOKENS = 1000
+
+
+class TokenBudget:
+    """Rolling one-minute budget of API tokens shared by concurrent calls.
+
+    reserve() returns once the tokens fit under the limit for the last 60 seconds,
+    sleeping until the oldest reservations age out otherwise; a single request larger
+    than the whole budget only waits for an empty window. reconcile() replaces a
+    reservation's estimate with the tokens the API reports the call actually used.
+
+    A limit of 0 (or less) disables the budget: reserve() returns None at once and
+    reconcile(None, ...) does nothing.
+
+    State is guarded by a threading.Lock rather than an asyncio.Lock so one instance can
+    serve every run in the process, whichever event loop it runs on.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        self.limit = tokens_per_minute
+        # [reserved_at, tokens] per reservation; tokens is None once it has aged out
+        self._window: "deque[List]" = deque()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.limit > 0
+
+    def _expire(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= 60:
+            entry = self._window.popleft()
+            self._used -= entry[1]
+            entry[1] = None
+
+    async def reserve(self, tokens: int) -> Optional[List]:
+        """Wait until ``tokens`` fit in the window and record them; returns the reservation."""
+        if not self.enabled:
+            return None
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                if not self._window or self._used + tokens <= self.limit:
+                    reservation = [now, tokens]
+                    self._window.append(reservation)
+                    self._used += tokens
+                    return reservation
+                wait = 60 - (now - self._window[0][0])
+            await asyncio.sleep(wait)
+
+    async def reserve_call(self, *texts: str, output_tokens: int = DEFAULT_OUTPUT_TOKENS) -> Optional[List]:
+        """Reserve one call whose prompt is made of ``texts``; skips counting when disabled."""
+        if not self.enabled:
+            return None
+        return await self.reserve(sum(count_tokens(t) for t in texts if t) + output_tokens)
+
+    def reconcile(self, reservation: Optional[List], tokens: Optional[int]) -> None:
+        """Replace a reservation's estimate with the actual token count."""
+        if reservation is None or tokens is None:
+            return
+        with self._lock:
+            if reservation[1] is not None:
+                self._used += tokens - reservation[1]
+                reservation[1] = tokens
+
+
+# One budget per process: the TPM limit applies to the API key, not to a single run
+TOKEN_BUDGET = TokenBudget(OPENAI_TPM_LIMIT)
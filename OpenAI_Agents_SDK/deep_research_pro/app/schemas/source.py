@@ -10,6 +10,9 @@ class SourceDoc(BaseModel):
     published: Optional[str] = None
     source_type: str = "web"  # now supports: "web", "file"
     provider: Optional[str] = Field(default=None, description="Search provider or site label")
+    token_estimate: Optional[int] = Field(
+        default=None, description="tiktoken count of content, set at summarization (None if unknown)"
+    )
 
 class SearchResult(BaseModel):
     """Per-result summary from search_agent."""
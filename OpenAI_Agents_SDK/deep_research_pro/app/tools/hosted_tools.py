@@ -4,6 +4,8 @@ from typing import List, Dict, Callable, Optional, Coroutine, Any
 from pydantic import BaseModel, Field
 from agents import Agent, Runner, WebSearchTool, ModelSettings
 
+from app.core.tokens import TOKEN_BUDGET
+
 # -----------------------------
 # Hosted provider (OpenAI WebSearchTool) – structured output
 # -----------------------------
@@ -52,10 +54,17 @@ def _get_hosted_agent() -> Agent:
         )
     return _HOSTED_AGENT
 
-async def _hosted_web_search_async(query: str) -> tuple[str, List[Dict]]:
-    """Run hosted web search agent and return (summary, results)."""
+async def _hosted_web_search_async(query: str, reservation=None) -> tuple[str, List[Dict]]:
+    """Run hosted web search agent and return (summary, results).
+    
+    ``reservation`` is the caller's TPM budget reservation for this search, if any;
+    it is reconciled with the usage the run reports.
+    """
     agent = _get_hosted_agent()
+    if reservation is None:
+        reservation = await TOKEN_BUDGET.reserve_call(agent.instructions, query)
     result = await Runner.run(agent, input=query)
+    TOKEN_BUDGET.reconcile(reservation, result.context_wrapper.usage.total_tokens)
     payload = result.final_output_as(SearchOutput)
     
     # Preserve the summary
@@ -74,7 +83,7 @@ async def _hosted_web_search_async(query: str) -> tuple[str, List[Dict]]:
     
     return (summary, out)
 
-def get_search_provider_async(name: str = "hosted", debug: bool = False) -> Callable[[str], Coroutine[Any, Any, tuple[str, List[Dict]]]]:
+def get_search_provider_async(name: str = "hosted", debug: bool = False) -> Callable[..., Coroutine[Any, Any, tuple[str, List[Dict]]]]:
     """Factory: returns async hosted search provider."""
     if name.lower() == "hosted":
         return _hosted_web_search_async
@@ -144,3 +144,25 @@ def test_cache_clear(temp_cache_db):
     assert stats["total_entries"] == 0
     assert len(temp_cache_db.l1_cache) == 0
 
+
+
+def test_cache_summaries_roundtrip(temp_cache_db):
+    """Test that per-result summaries are stored with, and invalidated by, cached results."""
+    query = "test query"
+    results = [{"title": "Test", "url": "https://example.com", "snippet": "Test snippet"}]
+    docs = [{"title": "Test", "url": "https://example.com", "content": "Full summary"}]
+    
+    temp_cache_db.set(query, results, "Test summary")
+    assert temp_cache_db.get_summaries(query) is None
+    
+    temp_cache_db.set_summaries(query, docs)
+    assert temp_cache_db.get_summaries(query) == docs
+    
+    # Survives dropping L1 (read back from SQLite)
+    temp_cache_db.l1_summaries.clear()
+    assert temp_cache_db.get_summaries(query) == docs
+    
+    # Fresh results for the same query drop the stale summaries
+    temp_cache_db.set(query, results, "New summary")
+    temp_cache_db.l1_summaries.clear()
+    assert temp_cache_db.get_summaries(query) is None
@@ -0,0 +1,200 @@
+"""
+Unit tests for markdown rendering.
+
+Pins the markdown produced for citations, heading anchors, References, and URL normalization.
+"""
+
+import pytest
+from html.parser import HTMLParser
+from app.core import render
+from app.core.render import render_markdown, _normalize_url
+from app.schemas.report import ResearchReport, Section, Subsection
+from app.schemas.source import SourceItem
+
+
+@pytest.fixture
+def source_index():
+    """Source Index with valid, upper-case scheme, and unusable URLs."""
+    return {
+        1: SourceItem(id=1, title="Alpha study", url="https://example.com/a"),
+        2: SourceItem(id=2, title="Beta report", url="HTTPS://Example.com/b"),
+        5: SourceItem(id=5, title="", url="no-netloc-slug-here"),
+        15: SourceItem(id=15, title="Gamma data", url="https:///missing-host"),
+    }
+
+
+def _body(markdown: str, heading: str) -> str:
+    """Return the line after the first "## heading" line."""
+    lines = markdown.splitlines()
+    return lines[lines.index(f"## {heading}") + 1]
+
+
+def test_render_bracketed_citations(source_index):
+    """Test that bracketed and adjacent bracketed IDs become links."""
+    report = ResearchReport(
+        topic="Topic",
+        sections=[Section(title="Findings", summary="Shown in [1][2] and [15].", citations=[1, 2, 15])],
+    )
+    markdown = render_markdown(report, source_index)
+
+    assert _body(markdown, "Findings") == (
+        'Shown in <a href="https://example.com/a">[1]</a> '
+        '<a href="https://Example.com/b">[2]</a> and <a href="#ref-15">[15]</a>.'
+    )
+
+
+def test_render_bare_citations(source_index):
+    """Test that bare IDs become links unless they follow a product/version word."""
+    report = ResearchReport(
+        topic="Topic",
+        sections=[Section(title="Findings", summary="Results 1 2, Model 2 and v2 1.", citations=[1, 2])],
+    )
+    markdown = render_markdown(report, source_index)
+
+    assert _body(markdown, "Findings") == (
+        'Results 1 <a href="https://Example.com/b">[2]</a>, Model 2 and v2 1.'
+    )
+
+
+def test_render_measurements_are_not_citations(source_index):
+    """Test that numbers followed by a unit, or not in the Source Index, are left alone."""
+    report = ResearchReport(
+        topic="Topic",
+        sections=[Section(title="Findings", summary="Rainfall of 5 [mm] over 15 days, 2 km, 1 percent.", citations=[])],
+    )
+    markdown = render_markdown(report, source_index)
+
+    assert _body(markdown, "Findings") == "Rainfall of 5 [mm] over 15 days, 2 km, 1 percent."
+
+
+def test_render_duplicate_headings_get_unique_anchors(source_index):
+    """Test that repeated headings get -1, -2 anchor suffixes in the Table of Contents."""
+    report = ResearchReport(
+        topic="Topic",
+        sections=[
+            Section(title="Overview", summary="First."),
+            Section(
+                title="Overview",
+                summary="Second.",
+                subsections=[Subsection(title="Overview", content="Nested.")],
+            ),
+        ],
+    )
+    markdown = render_markdown(report, source_index)
+
+    assert markdown.startswith(
+        "# Topic\n"
+        "\n## Table of Contents\n"
+        "- [Overview](#overview)\n"
+        "- [Overview](#overview-1)\n"
+        "  - [Overview](#overview-2)\n"
+    )
+
+
+def test_render_references_block(source_index):
+    """Test that References lists only cited sources, in ID order, after the Notes."""
+    report = ResearchReport(
+        topic="Topic",
+        sections=[
+            Section(title="Findings", summary="See [15] and [1].", citations=[15, 1]),
+            Section(title="More", summary="Also [5].", citations=[5]),
+        ],
+        notes=["Limited data."],
+    )
+    markdown = render_markdown(report, source_index)
+
+    assert markdown.endswith(
+        "\n## Notes\n"
+        "- Limited data.\n"
+        "\n<details>\n"
+        "<summary><h2 style='display: inline; margin: 0;'>References</h2></summary>\n"
+        "\n"
+        '<p id="ref-1">[1] <a href="https://example.com/a" target="_blank" rel="noopener noreferrer">Alpha study</a></p>\n'
+        '<p id="ref-5">[5] (Invalid URL: no-netloc-slug-here)</p>\n'
+        '<p id="ref-15">[15] <a href="#ref-15">Gamma data</a></p>\n'
+        "</details>\n"
+    )
+
+
+def test_render_without_sections():
+    """Test that a report with only a topic renders just the title."""
+    assert render_markdown(ResearchReport(topic="Topic")) == "# Topic\n"
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("https://example.com/a", ("https://example.com/a", "https://example.com/a")),
+        ("HTTPS://Example.com/b", ("https://Example.com/b", "https://Example.com/b")),
+        ("https://example.com/a?utm_source=openai", ("https://example.com/a", "https://example.com/a")),
+        ("https:///missing-host", ("#", "(Invalid URL: https:///missing-host)")),
+        ("example.com/page", ("https://example.com/page", "https://example.com/page")),
+        ("", ("#", "(No URL provided)")),
+    ],
+)
+def test_normalize_url(url, expected):
+    """Test URL normalization for upper-case schemes, empty netlocs, and bare domains."""
+    assert _normalize_url(url) == expected
+
+
+class _Elements(HTMLParser):
+    """Collects elements (with sorted attributes) and non-blank text in document order."""
+
+    def __init__(self):
+        super().__init__()
+        self.items = []
+
+    def handle_starttag(self, tag, attrs):
+        self.items.append((tag, sorted(attrs)))
+
+    def handle_endtag(self, tag):
+        self.items.append(("/" + tag,))
+
+    def handle_data(self, data):
+        if data.strip():
+            self.items.append(data.strip())
+
+
+def _elements(html: str) -> list:
+    """Parse HTML into a list comparable across renderers (attribute order and whitespace ignored)."""
+    parser = _Elements()
+    parser.feed(html)
+    return parser.items
+
+
+@pytest.mark.parametrize(
+    "markdown_text",
+    [
+        "| a | b |\n|---|---|\n| 1 | 2 |\n",
+        "Term\n: Definition here.\n",
+        "![Chart](chart.png){.wide}\n",
+        "<details>\n<summary>References</summary>\n\n<p id=\"ref-1\">[1] x</p>\n</details>\n",
+    ],
+)
+def test_markdown_backends_agree(markdown_text):
+    """Test that markdown-it with plugins renders the same elements as Python-Markdown."""
+    if render._MDIT_RENDERER is None:
+        pytest.skip("markdown-it-py / mdit-py-plugins not installed")
+    assert _elements(render._MDIT_RENDERER.render(markdown_text)) == _elements(render._pymd_to_html(markdown_text))
+
+
+def test_markdown_backends_footnotes():
+    """Test that both backends render footnotes as a linked note list."""
+    if render._MDIT_RENDERER is None:
+        pytest.skip("markdown-it-py / mdit-py-plugins not installed")
+    markdown_text = "Claim.[^1]\n\n[^1]: Source note.\n"
+    for html in (render._MDIT_RENDERER.render(markdown_text), render._pymd_to_html(markdown_text)):
+        assert "<sup" in html and "Source note." in html and 'href="#fn' in html
+
+
+@pytest.mark.parametrize(
+    "markdown_text",
+    [
+        "## Title {#custom}\n",
+        "HTML is ok.\n\n*[HTML]: Hyper Text\n",
+        '<div markdown="1">\n*em*\n</div>\n',
+    ],
+)
+def test_markdown_python_markdown_only_syntax(markdown_text):
+    """Test that syntax only Python-Markdown supports is rendered by it."""
+    assert render._markdown_to_html(markdown_text) == render._pymd_to_html(markdown_text)
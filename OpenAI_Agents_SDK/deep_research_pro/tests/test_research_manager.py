@@ -4,9 +4,16 @@ Unit tests for ResearchManager core functionality.
 Tests source filtering, deduplication, and key pipeline methods.
 """
 
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from app.core.research_manager import ResearchManager
+from app.core.research_manager import (
+    ResearchManager,
+    _BackgroundTasks,
+    _count_tokens_cached,
+    _format_sources_for_writer,
+)
+from app.core.tokens import TOKEN_BUDGET
 from app.schemas.source import SourceDoc
 
 
@@ -88,6 +95,57 @@ def test_deduplicate_sources(research_manager, sample_sources):
     assert not any(s.url == "https://example.com/1" and s.title == "Source 3" for s in deduplicated)
 
 
+def test_deduplicate_sources_exact_content(research_manager):
+    """Test that a repeat of a kept source's URL and content is dropped despite a new title."""
+    content = "Identical scraped lede text. " * 50
+    sources = [
+        SourceDoc(title="Quantum computing breakthroughs", url="https://example.com/q", content=content),
+        SourceDoc(title="Error correction milestones reached", url="https://example.com/q", content=content),
+        SourceDoc(title="Error correction milestones reached", url="https://example.com/r", content="Different body " * 40),
+    ]
+    deduplicated = research_manager._deduplicate_sources(sources)
+    
+    assert [s.url for s in deduplicated] == ["https://example.com/q", "https://example.com/r"]
+    assert deduplicated[0].title == "Quantum computing breakthroughs"
+
+
+@pytest.fixture
+def near_duplicate_sources():
+    """Three syndicated copies of one article under different titles and URLs."""
+    body = " ".join(f"Paragraph {i} covers qubit fidelity and error correction results." for i in range(60))
+    return [
+        SourceDoc(title="Quantum computing breakthroughs", url="https://example.com/a", content=body),
+        # Same first 500 characters, edited tail
+        SourceDoc(title="Error correction milestones reached", url="https://mirror.example.org/b",
+                  content=body + " Updated with a correction."),
+        # Same article with an edited lede, so the first 500 characters differ
+        SourceDoc(title="Syndicated qubit fidelity report", url="https://news.example.net/c",
+                  content="Editor's note: republished. " + body),
+        SourceDoc(title="Unrelated climate policy analysis", url="https://example.com/d",
+                  content="Carbon pricing schemes and emissions trading. " * 40),
+    ]
+
+
+def test_deduplicate_sources_near_duplicate_minhash(research_manager, near_duplicate_sources):
+    """Test that MinHash-LSH drops near-duplicate content even when the prefixes differ."""
+    pytest.importorskip("datasketch")
+    deduplicated = research_manager._deduplicate_sources(near_duplicate_sources)
+    
+    assert [s.url for s in deduplicated] == ["https://example.com/a", "https://example.com/d"]
+
+
+def test_deduplicate_sources_near_duplicate_fallback(research_manager, near_duplicate_sources, monkeypatch):
+    """Test that without datasketch only sources sharing a content prefix are dropped."""
+    monkeypatch.setattr("app.core.research_manager.MinHashLSH", None)
+    deduplicated = research_manager._deduplicate_sources(near_duplicate_sources)
+    
+    assert [s.url for s in deduplicated] == [
+        "https://example.com/a",
+        "https://news.example.net/c",
+        "https://example.com/d",
+    ]
+
+
 def test_filter_top_sources(research_manager, sample_sources):
     """Test that _filter_top_sources prioritizes sources with richer content."""
     # Remove duplicates first
@@ -186,3 +244,140 @@ def test_merge_sources(research_manager, sample_sources):
     research_manager._merge_sources([sample_sources[3]])
     assert len(research_manager.source_index) == 3
 
+
+
+@pytest.fixture
+def staged_search(research_manager, monkeypatch):
+    """Manager whose web search finishes "fast" before "slow", with caching and the TPM budget disabled."""
+    monkeypatch.setattr(TOKEN_BUDGET, "limit", 0)
+    research_manager.cache_manager = MagicMock()
+    research_manager.cache_manager.get.return_value = None
+    research_manager._cache_source_summaries = MagicMock()
+    delays = {"fast": 0.01, "slow": 0.05}
+    cancelled = []
+    
+    async def web_search(q, reservation=None):
+        try:
+            await asyncio.sleep(delays[q])
+        except asyncio.CancelledError:
+            cancelled.append(q)
+            raise
+        results = [
+            {"title": f"{q} result {i}", "url": f"https://{q}.example.com/{i}", "snippet": "Snippet"}
+            for i in range(3)
+        ]
+        return f"Summary of {q}", results
+    
+    research_manager.web_search_async = web_search
+    research_manager.search_agent.summarize_result_async = AsyncMock(return_value="Detailed summary.")
+    return research_manager, delays, cancelled
+
+
+@pytest.mark.asyncio
+async def test_run_web_search_early_cutoff_keeps_finished(staged_search):
+    """Test that the capacity cutoff cancels slow searches but keeps finished queries."""
+    manager, delays, cancelled = staged_search
+    manager.max_sources = 2
+    delays["slow"] = 30
+    
+    sources, summaries = await asyncio.wait_for(manager.run_web_search(["slow", "fast"], []), timeout=5)
+    
+    assert [s.url for s in sources] == [f"https://fast.example.com/{i}" for i in range(3)]
+    assert summaries == ["Query: fast\nSummary: Summary of fast"]
+    # The slow search itself was stopped, not just left out of the result
+    assert cancelled == ["slow"]
+    assert manager._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_run_web_search_without_capacity_waits_for_all(staged_search):
+    """Test that no early cutoff happens when there is no source capacity left."""
+    manager, _, cancelled = staged_search
+    manager.max_sources = 0
+    
+    sources, summaries = await manager.run_web_search(["slow", "fast"], [])
+    
+    assert len(sources) == 6
+    assert summaries == [
+        "Query: slow\nSummary: Summary of slow",
+        "Query: fast\nSummary: Summary of fast",
+    ]
+    assert cancelled == []
+
+
+@pytest.mark.asyncio
+async def test_coalesced_survives_cancelled_caller(research_manager):
+    """Test that cancelling one caller does not cancel the call shared with another."""
+    calls = 0
+    
+    async def make_call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+    
+    first = asyncio.create_task(research_manager._coalesced(("search", "q"), make_call))
+    second = asyncio.create_task(research_manager._coalesced(("search", "q"), make_call))
+    await asyncio.sleep(0)
+    first.cancel()
+    
+    assert await second == "result"
+    assert first.cancelled()
+    assert calls == 1
+    assert research_manager._inflight == {}
+
+
+def test_token_counting_special_token_text(research_manager):
+    """Test that scraped text containing tiktoken special tokens is counted as plain text."""
+    text = "Model cards mention <|endoftext|> and <|im_start|> markers. " * 200
+    source = SourceDoc(title="Tokenizer markers explained", url="https://example.com/t", content=text)
+    
+    assert research_manager._estimate_token_count(text) > 0
+    assert _count_tokens_cached(text) > 0
+    formatted = _format_sources_for_writer([source], max_summary_length=1000)
+    assert len(formatted) == 1
+    assert "<|endoftext|>" in formatted[0]
+
+
+@pytest.mark.asyncio
+async def test_background_tasks_cancelled_on_error():
+    """Test that tasks still pending when the run block raises are cancelled."""
+    async def finished():
+        return "done"
+    
+    with pytest.raises(RuntimeError):
+        with _BackgroundTasks() as background:
+            done_task = background.start(finished())
+            await done_task
+            pending_task = background.start(asyncio.sleep(30))
+            raise RuntimeError("draft failed")
+    
+    with pytest.raises(asyncio.CancelledError):
+        await pending_task
+    assert done_task.result() == "done"
+
+
+@pytest.mark.asyncio
+async def test_coalesced_cancels_call_without_callers(research_manager):
+    """Test that cancelling the only caller cancels the shared call and drops its entry."""
+    started = asyncio.Event()
+    call_cancelled = False
+    
+    async def make_call():
+        nonlocal call_cancelled
+        started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            call_cancelled = True
+            raise
+    
+    caller = asyncio.create_task(research_manager._coalesced(("search", "q"), make_call))
+    await started.wait()
+    caller.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await caller
+    await asyncio.sleep(0)
+    
+    assert call_cancelled
+    assert research_manager._inflight == {}
@@ -0,0 +1,77 @@
+"""
+Unit tests for the TPM token budget.
+
+Tests reservation, reconciliation with reported usage, and the disabled default.
+"""
+
+import asyncio
+import pytest
+from unittest.mock import MagicMock, patch
+from app.core import safe
+from app.core.tokens import TOKEN_BUDGET, TokenBudget
+
+
+@pytest.mark.asyncio
+async def test_token_budget_reconcile():
+    """Test that reconciling a reservation frees the unused part of its estimate."""
+    budget = TokenBudget(100)
+    reservation = await budget.reserve(80)
+    budget.reconcile(reservation, 20)
+
+    # 20 used + 70 fits under the limit, so this must not wait for the window to roll over
+    await asyncio.wait_for(budget.reserve(70), timeout=1)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(budget.reserve(20), timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_token_budget_oversized_reservation_waits_for_empty_window():
+    """Test that a reservation larger than the limit waits for an empty window, then goes through."""
+    budget = TokenBudget(100)
+    earlier = await budget.reserve(50)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(budget.reserve(500), timeout=0.05)
+
+    # Once the earlier reservation has aged out the window is empty, so it is granted at once
+    # (backdate it rather than sleeping a minute)
+    earlier[0] -= 60
+    reservation = await asyncio.wait_for(budget.reserve(500), timeout=1)
+    assert reservation[1] == 500
+
+
+@pytest.mark.asyncio
+async def test_token_budget_disabled():
+    """Test that a limit of 0 never waits and hands out no reservations."""
+    budget = TokenBudget(0)
+
+    assert await asyncio.wait_for(budget.reserve(10**9), timeout=1) is None
+    assert await budget.reserve_call("prompt") is None
+    budget.reconcile(None, 500)
+
+
+@pytest.mark.asyncio
+async def test_safe_run_async_reconciles_reported_usage(monkeypatch):
+    """Test that safe_run_async charges the budget with the usage the run reports."""
+    budget = TokenBudget(1000)
+    monkeypatch.setattr(safe, "TOKEN_BUDGET", budget)
+    result = MagicMock()
+    result.context_wrapper.usage.total_tokens = 150
+    result.final_output_as.return_value = "done"
+    agent = MagicMock(instructions="Be brief.")
+
+    reservation = await budget.reserve(900)
+    with patch("app.core.safe.Runner.run", return_value=result) as run:
+        assert await safe.safe_run_async(agent, "prompt", str, reservation=reservation) == "done"
+
+    run.assert_awaited_once()
+    assert reservation[1] == 150
+    # The 750 tokens the estimate over-reserved are free again
+    await asyncio.wait_for(budget.reserve(850), timeout=1)
+
+
+def test_token_budget_disabled_by_default():
+    """Test that the shared budget is off unless OPENAI_TPM_LIMIT is set."""
+    if TOKEN_BUDGET.limit:
+        pytest.skip("OPENAI_TPM_LIMIT is set in this environment")
+    assert not TOKEN_BUDGET.enabled